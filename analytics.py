@@ -1,10 +1,30 @@
 import time
-from collections import defaultdict
-import json
+from collections import defaultdict, deque
+from threading import Lock
+import numpy as np
 
 class PerformanceAnalytics:
-    def __init__(self):
-        self.mission_history = []
+    def __init__(self, capacity=100, store=None):
+        # Fixed-capacity columnar ring buffer holding the last `capacity` missions
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity)
+        self.transfer_times = np.zeros(capacity)
+        self.fuel_dv = np.zeros(capacity)
+        self.fuel_mass = np.zeros(capacity)
+        self.efficiency = np.zeros(capacity)
+        self.target_codes = np.zeros(capacity, dtype=np.int16)
+        self.configs = [None] * capacity
+        self.head = 0  # next slot to write
+        self.count = 0
+        self.total_logged = 0
+
+        self.targets = []  # code -> target name
+        self._target_index = {}
+        self.efficiency_sum = 0.0
+        self.target_counts = defaultdict(int)
+        self.target_efficiency_sums = defaultdict(float)
+        self._target_best = defaultdict(deque)  # monotonic (sequence, score) deques for windowed max
+
         self.performance_metrics = defaultdict(list)
         self.user_stats = {
             'total_simulations': 0,
@@ -12,110 +32,173 @@ class PerformanceAnalytics:
             'avg_efficiency': 0,
             'learning_progress': {}
         }
-    
+
+        # With a shared store the ring is fed from committed rows, so every worker sees the same window
+        self.store = store
+        self._synced_id = 0
+        self._lock = Lock()  # guards the ring buffer in both modes
+        if store:
+            self.sync()
+
     def log_simulation(self, target, result, user_config=None):
         """Log simulation for analytics"""
-        timestamp = time.time()
-        
-        mission_data = {
+        fuel = result.get('fuel', {})
+        row = (time.time(), target, result.get('transfer_time', 0), fuel.get('total_dv', 0),
+               fuel.get('fuel_mass', 0), self.calculate_efficiency_score(target, result), user_config or {})
+        if self.store:
+            self.store.record_simulation(*row)
+            return
+        with self._lock:
+            self._append(*row)
+            self.update_user_stats()
+
+    def sync(self):
+        """Pull rows committed by any worker since the last sync into the ring buffer"""
+        if not self.store:
+            return
+        with self._lock:
+            self.store.flush()
+            for row_id, *row in self.store.load_simulations(self._synced_id, self.capacity):
+                self._append(*row)
+                self._synced_id = row_id
+            self.update_user_stats()
+
+    def _append(self, timestamp, target, transfer_time, fuel_dv, fuel_mass, score, config):
+        if target not in self._target_index:
+            self._target_index[target] = len(self.targets)
+            self.targets.append(target)
+        slot = self.head
+
+        # Evict the oldest mission once the window is full
+        if self.count == self.capacity:
+            old_target = self.targets[self.target_codes[slot]]
+            old_score = float(self.efficiency[slot])
+            self.efficiency_sum -= old_score
+            self.target_counts[old_target] -= 1
+            self.target_efficiency_sums[old_target] -= old_score
+            best = self._target_best[old_target]
+            if best and best[0][0] == self.total_logged - self.capacity:
+                best.popleft()
+            if self.target_counts[old_target] == 0:
+                del self.target_counts[old_target]
+                del self.target_efficiency_sums[old_target]
+        else:
+            self.count += 1
+
+        self.timestamps[slot] = timestamp
+        self.target_codes[slot] = self._target_index[target]
+        self.transfer_times[slot] = transfer_time
+        self.fuel_dv[slot] = fuel_dv
+        self.fuel_mass[slot] = fuel_mass
+        self.efficiency[slot] = score
+        self.configs[slot] = config
+
+        self.efficiency_sum += score
+        self.target_counts[target] += 1
+        self.target_efficiency_sums[target] += score
+        best = self._target_best[target]
+        while best and best[-1][1] <= score:
+            best.pop()
+        best.append((self.total_logged, score))
+
+        self.total_logged += 1
+        self.head = (slot + 1) % self.capacity
+        if self.head == 0:
+            self._resync_sums()
+
+    def _resync_sums(self):
+        # Once per wrap (amortized O(1)) re-derive running sums to cancel float drift
+        codes = self.target_codes[:self.count]
+        scores = self.efficiency[:self.count]
+        self.efficiency_sum = float(np.sum(scores))
+        for target in self.target_counts:
+            self.target_efficiency_sums[target] = float(np.sum(scores[codes == self._target_index[target]]))
+
+    def _window(self, start, stop=None):
+        """Ring slots for history[start:stop] in chronological order"""
+        positions = np.arange(self.count)[start:stop]
+        return (self.head - self.count + positions) % self.capacity
+
+    def _records(self, slots):
+        return [{
             'timestamp': timestamp,
-            'target': target,
-            'transfer_time': result.get('transfer_time', 0),
-            'fuel_dv': result.get('fuel', {}).get('total_dv', 0),
-            'fuel_mass': result.get('fuel', {}).get('fuel_mass', 0),
-            'efficiency_score': self.calculate_efficiency_score(target, result),
-            'config': user_config or {}
-        }
-        
-        self.mission_history.append(mission_data)
-        self.update_user_stats()
-        
-        # Keep only last 100 missions
-        if len(self.mission_history) > 100:
-            self.mission_history = self.mission_history[-100:]
-    
+            'target': self.targets[code],
+            'transfer_time': transfer_time,
+            'fuel_dv': fuel_dv,
+            'fuel_mass': fuel_mass,
+            'efficiency_score': score,
+            'config': self.configs[slot]
+        } for slot, timestamp, code, transfer_time, fuel_dv, fuel_mass, score in zip(
+            slots.tolist(), self.timestamps[slots].tolist(), self.target_codes[slots].tolist(),
+            self.transfer_times[slots].tolist(), self.fuel_dv[slots].tolist(),
+            self.fuel_mass[slots].tolist(), self.efficiency[slots].tolist())]
+
+    @property
+    def mission_history(self):
+        """Missions in the window, oldest first"""
+        return self._records(self._window(0))
+
     def calculate_efficiency_score(self, target, result):
         """Calculate mission efficiency score (0-100)"""
         fuel_dv = result.get('fuel', {}).get('total_dv', 0)
-        
+
         # Optimal delta-v values for comparison
         optimal_dv = {'venus': 5.5, 'mars': 6.3, 'jupiter': 8.8}
-        
+
         if fuel_dv <= 0 or target not in optimal_dv:
             return 50
-        
+
         efficiency = (optimal_dv[target] / fuel_dv) * 100
         return min(100, max(0, efficiency))
-    
+
     def update_user_stats(self):
-        """Update user statistics"""
-        if not self.mission_history:
+        """Update user statistics from running aggregates"""
+        if not self.count:
             return
-        
-        self.user_stats['total_simulations'] = len(self.mission_history)
-        
-        # Find favorite target
-        target_counts = defaultdict(int)
-        efficiency_sum = 0
-        
-        for mission in self.mission_history:
-            target_counts[mission['target']] += 1
-            efficiency_sum += mission['efficiency_score']
-        
-        self.user_stats['favorite_target'] = max(target_counts, key=target_counts.get)
-        self.user_stats['avg_efficiency'] = efficiency_sum / len(self.mission_history)
-    
+
+        self.user_stats['total_simulations'] = self.count
+        self.user_stats['favorite_target'] = max(self.target_counts, key=self.target_counts.get)
+        self.user_stats['avg_efficiency'] = self.efficiency_sum / self.count
+
     def get_performance_trends(self):
         """Get performance trends over time"""
-        if len(self.mission_history) < 2:
+        if self.count < 2:
             return {'trend': 'insufficient_data'}
-        
-        recent = self.mission_history[-10:]  # Last 10 missions
-        older = self.mission_history[-20:-10] if len(self.mission_history) >= 20 else []
-        
-        recent_avg = sum(m['efficiency_score'] for m in recent) / len(recent)
-        older_avg = sum(m['efficiency_score'] for m in older) / len(older) if older else recent_avg
-        
+
+        recent = self.efficiency[self._window(-10)]  # Last 10 missions
+        older = self.efficiency[self._window(-20, -10)] if self.count >= 20 else recent[:0]
+
+        recent_avg = float(np.mean(recent))
+        older_avg = float(np.mean(older)) if len(older) else recent_avg
+
         trend = 'improving' if recent_avg > older_avg + 5 else 'declining' if recent_avg < older_avg - 5 else 'stable'
-        
+
         return {
             'trend': trend,
             'recent_efficiency': recent_avg,
             'improvement': recent_avg - older_avg,
-            'total_missions': len(self.mission_history)
+            'total_missions': self.count
         }
-    
+
     def get_target_analytics(self):
         """Get analytics by target planet"""
-        target_stats = defaultdict(lambda: {'count': 0, 'avg_efficiency': 0, 'best_efficiency': 0})
-        
-        for mission in self.mission_history:
-            target = mission['target']
-            target_stats[target]['count'] += 1
-            target_stats[target]['avg_efficiency'] += mission['efficiency_score']
-            target_stats[target]['best_efficiency'] = max(
-                target_stats[target]['best_efficiency'], 
-                mission['efficiency_score']
-            )
-        
-        # Calculate averages
-        for target in target_stats:
-            if target_stats[target]['count'] > 0:
-                target_stats[target]['avg_efficiency'] /= target_stats[target]['count']
-        
-        return dict(target_stats)
-    
+        return {target: {
+            'count': count,
+            'avg_efficiency': self.target_efficiency_sums[target] / count,
+            'best_efficiency': self._target_best[target][0][1]
+        } for target, count in self.target_counts.items()}
+
     def get_recommendations(self):
         """Get personalized recommendations"""
         recommendations = []
-        
-        if len(self.mission_history) < 5:
+
+        if self.count < 5:
             recommendations.append({
                 'type': 'tutorial',
                 'message': 'Try the interactive tutorials to learn orbital mechanics basics!',
                 'action': 'open_tutorials'
             })
-        
+
         trends = self.get_performance_trends()
         if trends['trend'] == 'declining':
             recommendations.append({
@@ -123,23 +206,23 @@ class PerformanceAnalytics:
                 'message': 'Your efficiency has decreased. Try using gravity assists for better performance.',
                 'action': 'show_gravity_assist'
             })
-        
-        target_stats = self.get_target_analytics()
-        if 'jupiter' not in target_stats and len(self.mission_history) > 10:
+
+        if 'jupiter' not in self.target_counts and self.count > 10:
             recommendations.append({
                 'type': 'challenge',
                 'message': 'Ready for a challenge? Try a mission to Jupiter!',
                 'action': 'set_target_jupiter'
             })
-        
+
         return recommendations
-    
+
     def export_data(self):
         """Export analytics data"""
+        self.sync()
         return {
             'user_stats': self.user_stats,
             'performance_trends': self.get_performance_trends(),
             'target_analytics': self.get_target_analytics(),
             'recommendations': self.get_recommendations(),
-            'recent_missions': self.mission_history[-10:] if self.mission_history else []
-        }
\ No newline at end of file
+            'recent_missions': self._records(self._window(-10))
+        }
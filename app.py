@@ -1,89 +1,330 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, g, render_template, request, jsonify
 import numpy as np
+import atexit
+import hmac
+import math
 import os
 import time
-from config import HOST, PORT, DEBUG, MAX_STEPS, MIN_STEPS, PLANETS
-try:
-    from fuel_calculator import FuelCalculator
-    from launch_optimizer import LaunchOptimizer
-    from gravity_assist import GravityAssist
-    from mission_database import MissionDatabase
-    from mission_tracker import MissionTracker
-    from spacecraft_designer import SpacecraftDesigner
-    from tutorial_system import TutorialSystem
-    from analytics import PerformanceAnalytics
-except ImportError as e:
-    print(f"Warning: {e}. Some features may not work.")
-    FuelCalculator = None
-    LaunchOptimizer = None
-    GravityAssist = None
-    MissionDatabase = None
-    MissionTracker = None
-    SpacecraftDesigner = None
-    TutorialSystem = None
-    PerformanceAnalytics = None
+from datetime import datetime, timedelta
+from config import (HOST, PORT, DEBUG, MAX_STEPS, MIN_STEPS, MAX_BATCH_JOBS, PLANETS, TRAJECTORY_CACHE_SIZE,
+                    TRAJECTORY_ENGINES, PORKCHOP_CACHE_DIR, PORKCHOP_CACHE_MAX_FILES, PORKCHOP_MAX_GRID,
+                    PORKCHOP_MAX_SPAN_DAYS, PORKCHOP_MAX_TOF_DAYS, EPHEMERIS_CACHE_DIR, EPHEMERIS_START,
+                    EPHEMERIS_END, EPHEMERIS_STEP_DAYS, MONTE_CARLO_MAX_SAMPLES, MONTE_CARLO_CHUNK_SIZE,
+                    ROUTE_SEARCH_MAX_DEPTH, ROUTE_SEARCH_WORKERS, ROUTE_SEARCH_PARALLEL_THRESHOLD, TIME_SCALE,
+                    TRACKER_ARCHIVE_SIZE, TRACKER_PAGE_SIZE, TRACKING_UPDATE_INTERVAL, STREAM_MAX_SUBSCRIBERS,
+                    STREAM_RESERVED_THREADS, STREAM_QUEUE_SIZE, FEATURES, DATABASE_PATH, STORE_BATCH_SIZE,
+                    STORE_HISTORY_LIMIT, MAX_MASS, MAX_COST, DESIGN_MAX_COMBINATIONS, METRICS_QUANTILES,
+                    METRICS_PROFILE_SAMPLE_RATE, METRICS_PROFILE_TOP, PREWARM_STEPS, STATIC_CACHE_MAX_AGE,
+                    MISSION_CATALOG_DIR, MISSION_PAGE_SIZE, MISSION_IMPORT_MAX_BYTES, MISSION_IMPORT_MAX_ROWS,
+                    MISSION_IMPORT_TOKEN, HISTORICAL_COMPARISON_LIMIT, JOB_WORKERS, JOB_MAX_PENDING,
+                    JOB_TIMEOUT, JOB_HISTORY_SIZE, JOB_RESULT_TTL, JOB_MAX_WAIT, JOB_DIR)
+from trajectory_cache import TrajectoryCache
+from trajectory_encoding import MEDIA_TYPE, DTYPES, ENCODINGS, encode_trajectory, compress_payload
+from trajectory_export import EXPORT_FORMATS, array_chunks, export_chunks
+from instrumentation import Metrics
+from response_cache import ResponseCache
+from subsystems import Lazy, SubsystemRegistry
+from orbital_mechanics import EARTH_DISTANCE, DAYS_PER_YEAR, sample_times, transfer_positions, transfer_time
 
 app = Flask(__name__)
+responses = ResponseCache(app.json.dumps, STATIC_CACHE_MAX_AGE)
+
+EMPTY_FUEL = {
+    'departure_dv': 0, 'arrival_dv': 0, 'total_dv': 0,
+    'fuel_mass': 0, 'total_mass': 1000, 'fuel_ratio': 0
+}
 
 class RocketSimulator:
+    # Optional subsystems, imported and constructed on first access (None when disabled or broken)
+    store = Lazy()
+    fuel_calc = Lazy()
+    ephemeris = Lazy()
+    launch_opt = Lazy()
+    gravity_assist = Lazy()
+    mission_db = Lazy()
+    tracker = Lazy()
+    designer = Lazy()
+    design_opt = Lazy()
+    tutorial = Lazy()
+    analytics = Lazy()
+    propagator = Lazy()
+    broadcaster = Lazy()
+    jobs = Lazy()
+
     def __init__(self):
+        start = time.perf_counter()
         self.planets = {k: v['distance'] for k, v in PLANETS.items()}
-        self.fuel_calc = FuelCalculator() if FuelCalculator else None
-        self.launch_opt = LaunchOptimizer() if LaunchOptimizer else None
-        self.gravity_assist = GravityAssist() if GravityAssist else None
-        self.mission_db = MissionDatabase() if MissionDatabase else None
-        self.tracker = MissionTracker() if MissionTracker else None
-        self.designer = SpacecraftDesigner() if SpacecraftDesigner else None
-        self.tutorial = TutorialSystem() if TutorialSystem else None
-        self.analytics = PerformanceAnalytics() if PerformanceAnalytics else None
-        
-    def calculate_mission(self, target, steps=200):
-        a_earth = 1.0
-        a_target = self.planets[target]
-        omega_earth, omega_target = 2*np.pi, 2*np.pi/a_target**1.5
-        a_transfer = (a_earth + a_target) / 2
-        e = abs(a_target - a_earth) / (a_earth + a_target)
-        t_transfer = a_transfer**1.5 / 2
-        
-        t = np.linspace(0, t_transfer, steps)
-        theta_target0 = np.pi - omega_target * t_transfer
-        
-        # Earth positions
-        theta_earth = omega_earth * t
-        x_earth = a_earth * np.cos(theta_earth)
-        y_earth = a_earth * np.sin(theta_earth)
-        
-        # Target positions
-        theta_target = theta_target0 + omega_target * t
-        x_target = a_target * np.cos(theta_target)
-        y_target = a_target * np.sin(theta_target)
-        
-        # Rocket trajectory
-        theta_rocket = np.pi * t / t_transfer
-        r_rocket = a_transfer * (1 - e**2) / (1 + e * np.cos(theta_rocket))
-        x_rocket = r_rocket * np.cos(theta_rocket)
-        y_rocket = r_rocket * np.sin(theta_rocket)
+        self.cache = TrajectoryCache(TRAJECTORY_CACHE_SIZE)
+        self.metrics = Metrics('rocket', METRICS_QUANTILES, METRICS_PROFILE_SAMPLE_RATE)
+        self.metrics.add_collector(self.cache_metrics)
+        self.stream_limit = STREAM_MAX_SUBSCRIBERS
+
+        self.subsystems = SubsystemRegistry(FEATURES)
+        register = self.subsystems.register
+        register('store', 'persistence', self._make_store, 'persistence')
+        register('fuel_calc', 'fuel_calculator', lambda m: m.FuelCalculator(), 'fuel_calculator')
+        register('ephemeris', 'ephemeris', self._make_ephemeris, 'ephemeris')
+        register('launch_opt', 'launch_optimizer',
+                 lambda m: m.LaunchOptimizer(PORKCHOP_CACHE_DIR, self.ephemeris, PORKCHOP_CACHE_MAX_FILES),
+                 'launch_optimizer')
+        register('gravity_assist', 'gravity_assist', lambda m: m.GravityAssist(), 'gravity_assist')
+        register('mission_db', 'mission_database', lambda m: m.MissionDatabase(MISSION_CATALOG_DIR), 'mission_database')
+        register('tracker', 'mission_tracker', lambda m: m.MissionTracker(TIME_SCALE, TRACKER_ARCHIVE_SIZE, self.store,
+                                                                            self.tracking_trajectory), 'mission_tracker')
+        register('designer', 'spacecraft_designer', lambda m: m.SpacecraftDesigner(), 'spacecraft_designer')
+        register('design_opt', 'design_optimizer', self._make_design_opt, 'spacecraft_designer')
+        register('tutorial', 'tutorial_system', lambda m: m.TutorialSystem(), 'tutorials')
+        register('analytics', 'analytics', lambda m: m.PerformanceAnalytics(store=self.store), 'analytics')
+        register('propagator', 'nbody_propagator', self._make_propagator, 'gravity_assist')
+        register('broadcaster', 'mission_stream', self._make_broadcaster, 'mission_tracker')
+        register('jobs', 'jobs', self._make_jobs, 'jobs')
+        self.startup_ms = (time.perf_counter() - start) * 1000
+
+    def _make_store(self, module):
+        store = module.MissionStore(DATABASE_PATH, STORE_BATCH_SIZE, STORE_HISTORY_LIMIT)
+        atexit.register(store.close)
+        return store
+
+    def _make_ephemeris(self, module):
+        return module.Ephemeris(EPHEMERIS_CACHE_DIR, datetime.strptime(EPHEMERIS_START, '%Y-%m-%d'),
+                                datetime.strptime(EPHEMERIS_END, '%Y-%m-%d'), EPHEMERIS_STEP_DAYS)
+
+    def _make_design_opt(self, module):
+        if not (self.designer and self.fuel_calc):
+            return None
+        return module.DesignOptimizer(self.designer, self.fuel_calc, MAX_MASS, MAX_COST, DESIGN_MAX_COMBINATIONS)
+
+    def _make_propagator(self, module):
+        return module.NBodyPropagator(self.gravity_assist.planets) if self.gravity_assist else None
+
+    def _make_broadcaster(self, module):
+        if not self.tracker:
+            return None
+        return module.MissionBroadcaster(self.tracker, TRACKING_UPDATE_INTERVAL / 1000,
+                                         self.stream_limit, STREAM_QUEUE_SIZE)
+
+    def limit_streams(self, threads):
+        """Cap /mission-stream clients so they leave STREAM_RESERVED_THREADS of a fixed thread pool free"""
+        self.stream_limit = min(STREAM_MAX_SUBSCRIBERS, max(threads - STREAM_RESERVED_THREADS, 0))
+        broadcaster = self.subsystems.peek('broadcaster')
+        if broadcaster:
+            broadcaster.max_subscribers = self.stream_limit
+        return self.stream_limit
+
+    def _make_jobs(self, module):
+        runner = module.JobRunner(JOB_WORKERS, JOB_MAX_PENDING, JOB_TIMEOUT, JOB_HISTORY_SIZE, JOB_RESULT_TTL,
+                                  JOB_DIR, app.json.dumps)
+        self.metrics.add_collector(runner.metrics)
+        return runner
+
+    def prewarm(self, steps=PREWARM_STEPS):
+        """Fill the trajectory cache for every planet at the common step counts"""
+        return len(self.calculate_batch([(target, s) for target in self.planets for s in steps]))
+
+    def close(self):
+        """End live streams, stop background jobs and flush pending store writes (safe to call more than once)"""
+        broadcaster, store, jobs, assist = (self.subsystems.peek(name)
+                                            for name in ('broadcaster', 'store', 'jobs', 'gravity_assist'))
+        if broadcaster:
+            broadcaster.close()
+        if jobs:
+            jobs.close()
+        if assist:
+            assist.close()
+        if store:
+            store.close()
+
+    def cache_metrics(self):
+        """Trajectory cache counters for /metrics"""
+        stats = self.cache.stats()
+        return [
+            ('trajectory_cache_hits_total', 'counter', 'Trajectory cache hits', {}, stats['hits']),
+            ('trajectory_cache_misses_total', 'counter', 'Trajectory cache misses', {}, stats['misses']),
+            ('trajectory_cache_evictions_total', 'counter', 'Trajectory cache evictions', {}, stats['evictions']),
+            ('trajectory_cache_entries', 'gauge', 'Cached trajectories', {}, stats['size'])
+        ]
+
+    def tracking_trajectory(self, target):
+        """Trajectory used for live mission tracking"""
+        return self.calculate_mission(target, 100)
+        
+    def calculate_mission(self, target, steps=200, engine='analytic'):
+        """Calculate mission trajectory, served from the LRU cache when possible"""
+        result, _ = self.calculate_mission_arrays(target, steps, engine)
+        return result
+    
+    def calculate_mission_arrays(self, target, steps=200, engine='analytic'):
+        """Calculate mission trajectory plus a (3, steps, 2) array of earth/target/rocket positions"""
+        key = (target, steps, self.planets[target], engine)
+        entry = self.cache.get(key)
+        if entry is None:
+            with self.metrics.timer('stage_duration', stage='compute', engine=engine):
+                if engine == 'nbody':
+                    entry = self._compute_nbody(target, steps)
+                else:
+                    entry = self._compute_batch([(target, steps)])[0]
+            self.cache.put(key, entry)
+        result, positions = entry
+        return self._with_history(target, result), positions
+    
+    def calculate_batch(self, jobs):
+        """Calculate several (target, steps) missions, computing all cache misses in one pass"""
+        keys = [(target, steps, self.planets[target], 'analytic') for target, steps in jobs]
+        entries = [self.cache.get(key) for key in keys]
+        
+        pending = {}
+        for key, entry in zip(keys, entries):
+            if entry is None:
+                pending.setdefault(key, (key[0], key[1]))
+        
+        if pending:
+            with self.metrics.timer('stage_duration', stage='compute_batch', engine='analytic'):
+                computed = dict(zip(pending, self._compute_batch(list(pending.values()))))
+            for key, entry in computed.items():
+                self.cache.put(key, entry)
+            entries = [entry if entry is not None else computed[key]
+                       for key, entry in zip(keys, entries)]
+        
+        return [self._with_history(target, result) for (target, _), (result, _) in zip(jobs, entries)]
+
+    def _with_history(self, target, result):
+        """Copy of a cached result with a fresh comparison against the (changeable) mission catalog"""
+        result = dict(result)
+        result['historical'] = (self.mission_db.compare_with_simulation(target, result['transfer_time'], HISTORICAL_COMPARISON_LIMIT)
+                                if self.mission_db else None)
+        return result
+    
+    def _compute_batch(self, jobs):
+        """Compute Hohmann transfers for all jobs over a padded 2D time grid, as (result, positions) pairs"""
+        a_targets = np.array([self.planets[target] for target, _ in jobs])
+        num_steps = np.array([steps for _, steps in jobs])
+        t_transfer = transfer_time(EARTH_DISTANCE, a_targets)
+        
+        # Row i matches np.linspace(0, t_transfer[i], num_steps[i]); columns past that are padding
+        t = sample_times(t_transfer, num_steps)
+        (x_earth, y_earth), (x_target, y_target), (x_rocket, y_rocket) = transfer_positions(a_targets[:, None], t)
+        distance = np.sqrt(x_rocket**2 + y_rocket**2)
         
         # Calculate fuel requirements if available
-        fuel_data = self.fuel_calc.mission_fuel(a_target) if self.fuel_calc else {
-            'departure_dv': 0, 'arrival_dv': 0, 'total_dv': 0,
-            'fuel_mass': 0, 'total_mass': 1000, 'fuel_ratio': 0
-        }
-        
-        # Compare with historical missions
-        historical_comparison = self.mission_db.compare_with_simulation(target, t_transfer * 365.25) if self.mission_db else None
-        
-        return {
-            'earth': list(zip(x_earth.tolist(), y_earth.tolist())),
-            'target': list(zip(x_target.tolist(), y_target.tolist())),
-            'rocket': list(zip(x_rocket.tolist(), y_rocket.tolist())),
-            'transfer_time': t_transfer * 365.25,
-            'max_distance': float(np.max(np.sqrt(x_rocket**2 + y_rocket**2))),
-            'fuel': fuel_data,
-            'historical': historical_comparison
-        }
+        fuel = self.fuel_calc.mission_fuel(a_targets) if self.fuel_calc else None
+        
+        results = []
+        for i, (target, steps) in enumerate(jobs):
+            transfer_days = float(t_transfer[i]) * DAYS_PER_YEAR
+            fuel_data = {k: v[i] for k, v in fuel.items()} if fuel else dict(EMPTY_FUEL)
+            
+            positions = np.stack([
+                np.stack([x_earth[i, :steps], y_earth[i, :steps]], axis=-1),
+                np.stack([x_target[i, :steps], y_target[i, :steps]], axis=-1),
+                np.stack([x_rocket[i, :steps], y_rocket[i, :steps]], axis=-1)
+            ])
+            
+            results.append(({
+                'earth': list(zip(x_earth[i, :steps].tolist(), y_earth[i, :steps].tolist())),
+                'target': list(zip(x_target[i, :steps].tolist(), y_target[i, :steps].tolist())),
+                'rocket': list(zip(x_rocket[i, :steps].tolist(), y_rocket[i, :steps].tolist())),
+                'transfer_time': transfer_days,
+                'max_distance': float(np.max(distance[i, :steps])),
+                'fuel': fuel_data
+            }, positions))
+        
+        return results
+    
+    def _compute_nbody(self, target, steps):
+        """Propagate the transfer with the N-body engine, keeping the analytic fuel budget"""
+        if not self.propagator:
+            raise RuntimeError('N-body engine not available')
+        result, positions = self.propagator.mission(target, steps)
+        result['fuel'] = self.fuel_calc.mission_fuel(self.planets[target]) if self.fuel_calc else dict(EMPTY_FUEL)
+        result['engine'] = 'nbody'
+        return result, positions
 
 simulator = RocketSimulator()
+metrics = simulator.metrics
+metrics.describe('request_duration', 'summary', 'Request latency by route, method and status')
+metrics.describe('stage_duration', 'summary', 'Latency of request stages')
+metrics.describe('response_bytes_total', 'counter', 'Response payload bytes by route (streamed bodies excluded)')
+metrics.describe('request_errors_total', 'counter', 'Responses with a 4xx or 5xx status')
+
+def response_cache_metrics():
+    stats = responses.stats()
+    return [
+        ('response_cache_hits_total', 'counter', 'Static responses served from pre-serialized bodies', {}, stats['hits']),
+        ('response_cache_not_modified_total', 'counter', 'Conditional requests answered 304', {}, stats['not_modified']),
+        ('response_cache_bytes', 'gauge', 'Bytes held in pre-serialized bodies', {}, stats['bytes'])
+    ]
+metrics.add_collector(response_cache_metrics)
+
+def prewarm_responses():
+    """Serialize the static tutorial, quiz and preset bodies before the first request"""
+    if simulator.tutorial:
+        responses.get(('tutorials',), simulator.tutorial.get_all_tutorials)
+        for tutorial_id, tutorial in simulator.tutorial.tutorials.items():
+            responses.get(('quiz', tutorial_id), lambda: simulator.tutorial.generate_quiz(tutorial_id))
+            for step in range(len(tutorial['steps'])):
+                responses.get(('tutorial', tutorial_id, step), lambda: simulator.tutorial.get_step(tutorial_id, step))
+    if simulator.designer:
+        responses.get(('presets',), simulator.designer.get_presets)
+    return responses.stats()['entries']
+
+# Job entry points, run in a job process against that process's own simulator
+def simulate_job(target, steps, engine):
+    return simulator.calculate_mission(target, steps, engine)
+
+def route_search_job(target, depth, top_k, workers=1):
+    return simulator.gravity_assist.search_routes(target, depth, top_k, workers, ROUTE_SEARCH_PARALLEL_THRESHOLD)
+
+def optimize_design_job(catalog, fixed, min_delta_v, top_k, sort_by):
+    return simulator.design_opt.optimize(catalog, fixed, min_delta_v, top_k, sort_by)
+
+def porkchop_job(target, start, span, tof_range, departures, tofs):
+    return simulator.launch_opt.porkchop(target, start, span, tof_range, departures, tofs)
+
+def dispersion_job(target, samples, seed, dispersions, bins):
+    report = simulator.fuel_calc.mission_fuel_dispersion(simulator.planets[target], samples, seed, dispersions,
+                                                         MONTE_CARLO_CHUNK_SIZE, bins)
+    report['target'] = target
+    return report
+
+def wants_async():
+    """?async=1 or a Prefer: respond-async header"""
+    return request.args.get('async') == '1' or 'respond-async' in request.headers.get('Prefer', '')
+
+def submit_job(kind, fn, args, on_done=None):
+    """202 with the job's status and Location, or 503 when jobs are off or the queue is full"""
+    if not simulator.jobs:
+        return jsonify({'error': 'Background jobs not available'}), 503
+    job, _ = simulator.jobs.submit(kind, fn, args, on_done)
+    if job is None:
+        return jsonify({'error': 'Job queue full'}), 503, {'Retry-After': '5'}
+    return jsonify(job.to_dict()), 202, {'Location': f'/jobs/{job.id}'}
+
+@app.before_request
+def start_request_timer():
+    if FEATURES.get('metrics'):
+        g.request_start = time.perf_counter_ns()
+        g.profile = metrics.start_profile()
+
+@app.after_request
+def record_request_metrics(response):
+    """Latency, payload size and errors per route (streamed bodies are timed up to the first byte)"""
+    start = g.pop('request_start', None)
+    if start is None:
+        return response
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    metrics.observe('request_duration', time.perf_counter_ns() - start,
+                    route=route, method=request.method, status=response.status_code)
+    if response.content_length is not None:
+        metrics.inc('response_bytes_total', response.content_length, route=route)
+    if response.status_code >= 400:
+        metrics.inc('request_errors_total', route=route, status=response.status_code)
+    return response
+
+@app.teardown_request
+def stop_request_profile(exc):
+    profile = g.pop('profile', None)
+    if profile:
+        metrics.stop_profile(profile)
 
 @app.route('/')
 def index():
@@ -95,17 +336,179 @@ def simulate():
         data = request.json or {}
         target = data.get('target', 'mars')
         steps = min(max(int(data.get('steps', 200)), MIN_STEPS), MAX_STEPS)  # Limit range
+        engine = data.get('engine', 'analytic')
         
         if target not in simulator.planets:
             return jsonify({'error': 'Invalid target planet'}), 400
+        if engine not in TRAJECTORY_ENGINES:
+            return jsonify({'error': 'Invalid trajectory engine'}), 400
             
-        result = simulator.calculate_mission(target, steps)
+        output_format = request.args.get('format')
+        if output_format and output_format != 'binary' and output_format not in EXPORT_FORMATS:
+            return jsonify({'error': 'Unsupported output format'}), 400
+        binary = output_format == 'binary' or MEDIA_TYPE in request.headers.get('Accept', '')
+        dtype = request.args.get('dtype', 'float32')
+        encoding = request.args.get('compress')
+        if binary and (dtype not in DTYPES or (encoding and encoding not in ENCODINGS)):
+            return jsonify({'error': 'Unsupported binary dtype or compression'}), 400
+        
+        if wants_async():
+            if output_format or binary:
+                return jsonify({'error': 'Async simulations return JSON only'}), 400
+            def log_result(result):
+                if simulator.analytics:
+                    simulator.analytics.log_simulation(target, result, {'steps': steps, 'engine': engine, 'async': True})
+            return submit_job('simulate', simulate_job, (target, steps, engine), log_result)
+        
+        with metrics.timer('stage_duration', stage='calculate_mission', engine=engine):
+            result, positions = simulator.calculate_mission_arrays(target, steps, engine)
         
         # Log simulation for analytics
         if simulator.analytics:
-            simulator.analytics.log_simulation(target, result, {'steps': steps})
+            with metrics.timer('stage_duration', stage='analytics_log'):
+                simulator.analytics.log_simulation(target, result, {'steps': steps, 'engine': engine})
+        
+        if output_format in EXPORT_FORMATS:
+            # Streamed chunk by chunk as a file download
+            response = Response(export_chunks(array_chunks(positions), output_format, positions.shape[1]),
+                                mimetype=EXPORT_FORMATS[output_format])
+            response.headers['Content-Disposition'] = f'attachment; filename="{target}_trajectory.{output_format}"'
+            return response
+        if not binary:
+            with metrics.timer('stage_duration', stage='encode', format='json'):
+                return jsonify(result)
+        
+        with metrics.timer('stage_duration', stage='encode', format='binary'):
+            payload = compress_payload(encode_trajectory(result, positions, dtype), encoding)
+        response = Response(payload, mimetype=MEDIA_TYPE)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.headers['Vary'] = 'Accept'
+        return response
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/simulate-batch', methods=['POST'])
+def simulate_batch():
+    try:
+        data = request.json or {}
+        jobs = data.get('jobs', [])
+        if not isinstance(jobs, list) or not jobs:
+            return jsonify({'error': 'No jobs provided'}), 400
+        if len(jobs) > MAX_BATCH_JOBS:
+            return jsonify({'error': f'Too many jobs (max {MAX_BATCH_JOBS})'}), 400
+        
+        parsed = []
+        for job in jobs:
+            target = job.get('target', 'mars')
+            steps = min(max(int(job.get('steps', 200)), MIN_STEPS), MAX_STEPS)
+            if target not in simulator.planets:
+                return jsonify({'error': f'Invalid target planet: {target}'}), 400
+            parsed.append((target, steps))
+        
+        with metrics.timer('stage_duration', stage='calculate_batch'):
+            results = simulator.calculate_batch(parsed)
+        
+        # Log simulations for analytics
+        if simulator.analytics:
+            with metrics.timer('stage_duration', stage='analytics_log'):
+                for (target, steps), result in zip(parsed, results):
+                    simulator.analytics.log_simulation(target, result, {'steps': steps, 'batch': True})
+        
+        with metrics.timer('stage_duration', stage='encode', format='json'):
+            return jsonify({'results': results})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/dispersion/<target>', methods=['POST'])
+def dispersion(target):
+    try:
+        if target not in simulator.planets:
+            return jsonify({'error': 'Invalid target planet'}), 400
+            
+        if not simulator.fuel_calc:
+            return jsonify({'error': 'Fuel calculator not available'}), 503
+        from fuel_calculator import DEFAULT_DISPERSIONS
+        
+        data = request.json or {}
+        samples = int(data.get('samples', 100000))
+        if not 1 <= samples <= MONTE_CARLO_MAX_SAMPLES:
+            return jsonify({'error': f'samples must be between 1 and {MONTE_CARLO_MAX_SAMPLES}'}), 400
+        dispersions = data.get('dispersions', {})
+        if not isinstance(dispersions, dict) or any(
+                key not in DEFAULT_DISPERSIONS or not isinstance(value, (int, float)) or value < 0
+                for key, value in dispersions.items()):
+            return jsonify({'error': f'dispersions must map {", ".join(DEFAULT_DISPERSIONS)} to non-negative sigmas'}), 400
+        seed = data.get('seed')
+        bins = min(max(int(data.get('bins', 50)), 1), 500)
         
-        return jsonify(result)
+        args = (target, samples, None if seed is None else int(seed), dispersions, bins)
+        if wants_async():
+            return submit_job('dispersion', dispersion_job, args)
+        return jsonify(dispersion_job(*args))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/missions')
+def list_missions():
+    """Catalog query: filter by target, status, route body and launch dates, paginated"""
+    try:
+        if not simulator.mission_db:
+            return jsonify({'error': 'Mission database not available'}), 503
+        args = request.args
+        for bound in ('launched_after', 'launched_before'):
+            if bound in args:
+                datetime.strptime(args[bound], '%Y-%m-%d')
+        offset = max(int(args.get('offset', 0)), 0)
+        limit = min(max(int(args.get('limit', MISSION_PAGE_SIZE)), 1), MISSION_PAGE_SIZE)
+        return jsonify(simulator.mission_db.query(args.get('target'), args.get('status'), args.get('body'),
+                                                  args.get('launched_after'), args.get('launched_before'),
+                                                  offset, limit))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/missions/stats')
+def mission_stats():
+    try:
+        if not simulator.mission_db:
+            return jsonify({'error': 'Mission database not available'}), 503
+        return jsonify(simulator.mission_db.get_mission_stats())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/missions/<mission_id>')
+def get_mission(mission_id):
+    try:
+        if not simulator.mission_db:
+            return jsonify({'error': 'Mission database not available'}), 503
+        mission = simulator.mission_db.get_mission(mission_id)
+        if not mission:
+            return jsonify({'error': 'Mission not found'}), 404
+        return jsonify(mission)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/missions/import', methods=['POST'])
+def import_missions():
+    """Bulk-import a mission catalog sent as the body (?format=csv|ndjson|json)"""
+    try:
+        if not simulator.mission_db:
+            return jsonify({'error': 'Mission database not available'}), 503
+        if MISSION_IMPORT_TOKEN and not hmac.compare_digest(request.headers.get('Authorization', ''),
+                                                            f'Bearer {MISSION_IMPORT_TOKEN}'):
+            return jsonify({'error': 'Unauthorized'}), 401
+        if (request.content_length or 0) > MISSION_IMPORT_MAX_BYTES:
+            return jsonify({'error': f'Catalog larger than {MISSION_IMPORT_MAX_BYTES} bytes'}), 413
+        fmt = request.args.get('format', 'csv')
+        ids = simulator.mission_db.save_catalog(request.stream, fmt, MISSION_IMPORT_MAX_BYTES,
+                                                MISSION_IMPORT_MAX_ROWS)
+        return jsonify({'imported': len(ids), 'total_missions': len(simulator.mission_db.missions)})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -118,8 +521,78 @@ def launch_windows(target):
         if not simulator.launch_opt:
             return jsonify({'error': 'Launch optimizer not available'}), 503
             
-        windows = simulator.launch_opt.next_launch_windows(target)
-        return jsonify(windows)
+        # Windows only change with the date: cache until local midnight
+        now = datetime.now()
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        return responses.respond(request, ('launch-windows', target),
+                                 lambda: simulator.launch_opt.next_launch_windows(target),
+                                 version=now.date().isoformat(),
+                                 max_age=min(STATIC_CACHE_MAX_AGE, int((midnight - now).total_seconds())))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/porkchop/<target>')
+def porkchop(target):
+    try:
+        if target not in simulator.planets:
+            return jsonify({'error': 'Invalid target planet'}), 400
+            
+        if not simulator.launch_opt:
+            return jsonify({'error': 'Launch optimizer not available'}), 503
+        
+        args = request.args
+        departures = int(args.get('departures', 100))
+        tofs = int(args.get('tofs', 100))
+        if not (2 <= departures <= PORKCHOP_MAX_GRID and 2 <= tofs <= PORKCHOP_MAX_GRID):
+            return jsonify({'error': f'Grid size must be between 2 and {PORKCHOP_MAX_GRID}'}), 400
+        
+        start = datetime.strptime(args['start'], '%Y-%m-%d') if 'start' in args else None
+        span = float(args['span']) if 'span' in args else None
+        if span is not None and not (math.isfinite(span) and 0 < span <= PORKCHOP_MAX_SPAN_DAYS):
+            return jsonify({'error': f'span must be between 0 and {PORKCHOP_MAX_SPAN_DAYS} days'}), 400
+        tof_range = None
+        if 'tof_min' in args or 'tof_max' in args:
+            tof_range = (float(args.get('tof_min', 'nan')), float(args.get('tof_max', 'nan')))
+            if not (math.isfinite(tof_range[0]) and math.isfinite(tof_range[1])
+                    and 0 < tof_range[0] < tof_range[1] <= PORKCHOP_MAX_TOF_DAYS):
+                return jsonify({'error': f'tof_min and tof_max must satisfy '
+                                         f'0 < tof_min < tof_max <= {PORKCHOP_MAX_TOF_DAYS} days'}), 400
+        
+        job_args = (target, start, span, tof_range, departures, tofs)
+        if wants_async():
+            return submit_job('porkchop', porkchop_job, job_args)
+        return jsonify(porkchop_job(*job_args))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/ephemeris/<body>')
+def ephemeris(body):
+    try:
+        if not simulator.ephemeris:
+            return jsonify({'error': 'Ephemeris not available'}), 503
+        
+        if body not in simulator.ephemeris.index:
+            return jsonify({'error': 'Unknown body'}), 400
+        
+        args = request.args
+        date = datetime.strptime(args['date'], '%Y-%m-%d') if 'date' in args else datetime.now()
+        count = int(args.get('count', 1))
+        step = float(args.get('step', 1))
+        if not 1 <= count <= MAX_STEPS:
+            return jsonify({'error': f'count must be between 1 and {MAX_STEPS}'}), 400
+        
+        days = simulator.ephemeris.days(date) + np.arange(count) * step
+        position, velocity = simulator.ephemeris.state(body, days)
+        return jsonify({
+            'body': body,
+            'dates': [(date + timedelta(days=i * step)).isoformat() for i in range(count)],
+            'position': position.tolist(),  # AU, heliocentric ecliptic
+            'velocity': velocity.tolist()  # AU/day
+        })
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -137,6 +610,23 @@ def gravity_assist_routes(target):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/route-search/<target>')
+def route_search(target):
+    try:
+        if target not in simulator.planets:
+            return jsonify({'error': 'Invalid target planet'}), 400
+            
+        if not simulator.gravity_assist:
+            return jsonify({'error': 'Gravity assist calculator not available'}), 503
+        
+        depth = min(max(int(request.args.get('depth', 3)), 0), ROUTE_SEARCH_MAX_DEPTH)
+        top_k = min(max(int(request.args.get('top_k', 5)), 1), 50)
+        if wants_async():
+            return submit_job('route_search', route_search_job, (target, depth, top_k))
+        return jsonify(route_search_job(target, depth, top_k, ROUTE_SEARCH_WORKERS))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/start-tracking', methods=['POST'])
 def start_tracking():
     try:
@@ -148,8 +638,10 @@ def start_tracking():
             return jsonify({'error': 'Mission tracker not available'}), 503
             
         # Get trajectory data
-        trajectory = simulator.calculate_mission(target, 100)
+        trajectory = simulator.tracking_trajectory(target)
         simulator.tracker.start_mission(mission_id, target, trajectory)
+        if simulator.store:
+            simulator.store.flush()  # committed before we answer, so every worker can see it
         
         return jsonify({'mission_id': mission_id, 'status': 'started'})
     except Exception as e:
@@ -175,8 +667,31 @@ def active_missions():
         if not simulator.tracker:
             return jsonify({'error': 'Mission tracker not available'}), 503
             
-        missions = simulator.tracker.get_all_missions()
-        return jsonify(missions)
+        offset = max(int(request.args.get('offset', 0)), 0)
+        limit = min(max(int(request.args.get('limit', TRACKER_PAGE_SIZE)), 1), TRACKER_PAGE_SIZE)
+        missions = simulator.tracker.get_all_missions(offset, limit)
+        response = jsonify(missions)
+        response.headers['X-Total-Count'] = str(len(simulator.tracker.active_missions))
+        return response
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/mission-stream')
+@app.route('/mission-stream/<mission_id>')
+def mission_stream(mission_id=None):
+    try:
+        if not simulator.broadcaster:
+            return jsonify({'error': 'Mission tracker not available'}), 503
+        
+        if mission_id and not simulator.tracker.get_mission_progress(mission_id):
+            return jsonify({'error': 'Mission not found'}), 404
+        
+        subscription = simulator.broadcaster.subscribe(mission_id)
+        if subscription is None:
+            return jsonify({'error': 'Too many stream subscribers'}), 503
+        
+        return Response(simulator.broadcaster.stream(subscription), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -192,14 +707,39 @@ def design_spacecraft():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/optimize-design', methods=['POST'])
+def optimize_design():
+    try:
+        if not simulator.design_opt:
+            return jsonify({'error': 'Design optimizer not available'}), 503
+        
+        data = request.json or {}
+        catalog = data.get('catalog', {})
+        fixed = data.get('fixed', {})
+        sort_by = data.get('sort_by', 'delta_v')
+        top_k = min(max(int(data.get('top_k', 10)), 1), 100)
+        min_delta_v = float(data.get('min_delta_v', 0))
+        if not math.isfinite(min_delta_v):
+            return jsonify({'error': 'min_delta_v must be finite'}), 400
+        # Reject a bad catalog here with a 400 rather than as a failed background job
+        simulator.design_opt.validate(catalog, fixed, sort_by)
+        
+        args = (catalog, fixed, min_delta_v, top_k, sort_by)
+        if wants_async():
+            return submit_job('optimize_design', optimize_design_job, args)
+        return jsonify(optimize_design_job(*args))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/spacecraft-presets')
 def spacecraft_presets():
     try:
         if not simulator.designer:
             return jsonify({'error': 'Spacecraft designer not available'}), 503
             
-        presets = simulator.designer.get_presets()
-        return jsonify(presets)
+        return responses.respond(request, ('presets',), simulator.designer.get_presets)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -208,8 +748,7 @@ def get_tutorials():
     try:
         if not simulator.tutorial:
             return jsonify({'error': 'Tutorial system not available'}), 503
-        tutorials = simulator.tutorial.get_all_tutorials()
-        return jsonify(tutorials)
+        return responses.respond(request, ('tutorials',), simulator.tutorial.get_all_tutorials)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -218,10 +757,11 @@ def get_tutorial_step(tutorial_id, step):
     try:
         if not simulator.tutorial:
             return jsonify({'error': 'Tutorial system not available'}), 503
-        step_data = simulator.tutorial.get_step(tutorial_id, step)
-        if not step_data:
+        tutorial = simulator.tutorial.get_tutorial(tutorial_id)
+        if not tutorial or not 0 <= step < len(tutorial['steps']):
             return jsonify({'error': 'Tutorial step not found'}), 404
-        return jsonify(step_data)
+        return responses.respond(request, ('tutorial', tutorial_id, step),
+                                 lambda: simulator.tutorial.get_step(tutorial_id, step))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -230,8 +770,9 @@ def get_quiz(tutorial_id):
     try:
         if not simulator.tutorial:
             return jsonify({'error': 'Tutorial system not available'}), 503
-        quiz = simulator.tutorial.generate_quiz(tutorial_id)
-        return jsonify(quiz)
+        # Unknown ids share one empty entry so arbitrary ids cannot grow the cache
+        key = ('quiz', tutorial_id if tutorial_id in simulator.tutorial.quizzes else None)
+        return responses.respond(request, key, lambda: simulator.tutorial.generate_quiz(tutorial_id))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -245,6 +786,93 @@ def get_analytics():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/subsystems')
+def subsystems_report():
+    """Feature flag, load state and import/construction time of each subsystem; ?load=1 loads them all"""
+    try:
+        if request.args.get('load') == '1':
+            simulator.subsystems.load_all()
+        return jsonify({'startup_ms': simulator.startup_ms, 'subsystems': simulator.subsystems.report()})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/jobs')
+def list_jobs():
+    """Queue statistics and the newest jobs submitted to this worker"""
+    try:
+        if not simulator.jobs:
+            return jsonify({'error': 'Background jobs not available'}), 503
+        limit = min(max(int(request.args.get('limit', 100)), 1), 1000)
+        return jsonify({'stats': simulator.jobs.stats(), 'jobs': simulator.jobs.list(limit)})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/jobs/<job_id>', methods=['GET', 'DELETE'])
+def job_status(job_id):
+    """Job state and timings; DELETE cancels a queued or running job"""
+    try:
+        if not simulator.jobs:
+            return jsonify({'error': 'Background jobs not available'}), 503
+        status = simulator.jobs.cancel(job_id) if request.method == 'DELETE' else simulator.jobs.get(job_id)
+        if not status:
+            return jsonify({'error': 'Job not found'}), 404
+        return jsonify(status)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/jobs/<job_id>/result')
+def job_result(job_id):
+    """The job's result once done (202 while pending); ?wait=N long-polls up to JOB_MAX_WAIT seconds"""
+    try:
+        if not simulator.jobs:
+            return jsonify({'error': 'Background jobs not available'}), 503
+        wait = min(max(float(request.args.get('wait', 0)), 0), JOB_MAX_WAIT)
+        found = simulator.jobs.result(job_id, wait)
+        if not found:
+            return jsonify({'error': 'Job not found'}), 404
+        status, result = found
+        state = status['state']
+        if state == 'done':
+            return jsonify(result)
+        if state in ('queued', 'running'):
+            return jsonify(status), 202
+        code = {'cancelled': 409, 'timeout': 504}.get(state, 400 if status['error_type'] == 'ValueError' else 500)
+        return jsonify({'error': status['error'], 'job': status}), code
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/metrics')
+def get_metrics():
+    if not FEATURES.get('metrics'):
+        return jsonify({'error': 'Metrics not enabled'}), 503
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/metrics/profile', methods=['GET', 'POST'])
+def metrics_profile():
+    """Sampled cProfile report; POST {sample_rate, reset} to change sampling"""
+    try:
+        if not FEATURES.get('metrics'):
+            return jsonify({'error': 'Metrics not enabled'}), 503
+        if request.method == 'POST':
+            data = request.json or {}
+            if 'sample_rate' in data:
+                rate = float(data['sample_rate'])
+                if not 0 <= rate <= 1:
+                    return jsonify({'error': 'sample_rate must be between 0 and 1'}), 400
+                metrics.profile_sample_rate = rate
+            if data.get('reset'):
+                metrics.reset_profile()
+            return jsonify({'sample_rate': metrics.profile_sample_rate,
+                            'profiled_requests': metrics.profiled_requests})
+        sort = request.args.get('sort', 'cumulative')
+        if sort not in ('cumulative', 'tottime', 'calls'):
+            return jsonify({'error': 'sort must be cumulative, tottime or calls'}), 400
+        return Response(metrics.profile_report(METRICS_PROFILE_TOP, sort), mimetype='text/plain')
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 if __name__ == '__main__':
     os.makedirs('static', exist_ok=True)
     os.makedirs('templates', exist_ok=True)
@@ -0,0 +1,204 @@
+"""Benchmark suite for the simulation hot paths, with a JSON baseline and a regression gate
+
+    python benchmarks.py                          # run and print
+    python benchmarks.py --save baseline.json     # record a baseline
+    python benchmarks.py --compare baseline.json  # exit 1 on regressions past --threshold
+
+Each case reports wall time per call (best and median of several timed runs),
+throughput in items per second, and tracemalloc peak/net allocation for one call.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+import numpy as np
+import orbital_mechanics as om
+
+DEFAULT_BASELINE = 'benchmark_baseline.json'
+
+def cases(quick=False):
+    """Yield (name, items per call, callable), running each case's setup lazily"""
+    from config import DEFAULT_STEPS, MAX_STEPS, MIN_STEPS
+    from app import simulator
+
+    # Orbital-mechanics kernels: one scalar call vs a 1000-planet batch
+    distances = np.random.default_rng(0).uniform(0.3, 30, 1000)
+    for label, a, items in (('scalar', float(distances[0]), 1), ('batch', distances, len(distances))):
+        a = np.asarray(a)
+        yield f'kernel.hohmann_delta_v.{label}', items, lambda a=a: om.hohmann_delta_v(om.EARTH_DISTANCE, a)
+        yield f'kernel.transfer_positions.{label}', items, lambda a=a: om.transfer_positions(
+            a[..., None], om.sample_times(om.transfer_time(om.EARTH_DISTANCE, a), DEFAULT_STEPS))
+
+    # calculate_mission: cold (cache cleared each call) across the step range, then a cache hit
+    for steps in (MIN_STEPS, DEFAULT_STEPS, MAX_STEPS):
+        def cold(steps=steps):
+            simulator.cache.invalidate()
+            simulator.calculate_mission('mars', steps)
+        yield f'calculate_mission.cold.{steps}', 1, cold
+    yield 'calculate_mission.cached', 1, lambda: simulator.calculate_mission('mars', DEFAULT_STEPS)
+
+    def batch():
+        simulator.cache.invalidate()
+        simulator.calculate_batch([(target, steps) for target in simulator.planets
+                                   for steps in range(MIN_STEPS, MAX_STEPS + 1, 100)])
+    yield 'calculate_batch.cold', len(simulator.planets) * len(range(MIN_STEPS, MAX_STEPS + 1, 100)), batch
+
+    fuel = simulator.fuel_calc
+    yield 'fuel.mission_fuel.scalar', 1, lambda: fuel.mission_fuel(1.524)
+    yield 'fuel.mission_fuel.batch', len(distances), lambda: fuel.mission_fuel(distances)
+
+    assist = simulator.gravity_assist
+    def routes_cold():
+        assist._flyby_cache.clear()
+        for target in ('venus', 'mars', 'jupiter'):
+            assist.suggest_routes(target)
+    yield 'gravity_assist.suggest_routes.cold', 3, routes_cold
+    yield 'gravity_assist.suggest_routes.warm', 3, lambda: [assist.suggest_routes(t) for t in ('venus', 'mars', 'jupiter')]
+
+    # Analytics with the history window full
+    from analytics import PerformanceAnalytics
+    analytics = PerformanceAnalytics()
+    result = simulator.calculate_mission('mars', DEFAULT_STEPS)
+    for _ in range(analytics.capacity):
+        analytics.log_simulation('mars', result, {'steps': DEFAULT_STEPS})
+    yield 'analytics.log_simulation', 100, lambda: [analytics.log_simulation('mars', result) for _ in range(100)]
+    yield 'analytics.export_data', 1, analytics.export_data
+
+    # Tracker listing at growing mission counts
+    from mission_tracker import MissionTracker
+    trajectory = simulator.calculate_mission('mars', 100)
+    for count in ((1000, 10000) if quick else (1000, 10000, 100000)):
+        tracker = MissionTracker(time_scale=1)  # keep every mission in flight for the whole run
+        for i in range(count):
+            tracker.start_mission(f'bench-{i}', 'mars', trajectory)
+        yield f'tracker.get_all_missions.{count}', count, tracker.get_all_missions
+        yield f'tracker.get_all_missions.page.{count}', 100, lambda tracker=tracker: tracker.get_all_missions(0, 100)
+        del tracker
+
+    # Historical comparison with thousands of missions per target
+    from mission_database import MissionDatabase
+    catalog = MissionDatabase()
+    rng = np.random.default_rng(0)
+    count = 1000 if quick else 10000
+    catalog.import_missions({'id': f'bench-{i}', 'name': f'Bench {i}', 'launch_date': '2000-01-01', 'target': 'mars',
+                             'duration_days': int(d)} for i, d in enumerate(rng.integers(100, 3000, count)))
+    sim_time = result['transfer_time']
+
+    def compare_cold():
+        catalog._invalidate('mars')
+        catalog.compare_with_simulation('mars', sim_time, 10)
+    yield f'mission_db.compare.cold.{count}', count, compare_cold
+    yield f'mission_db.compare.warm.{count}', 1, lambda: catalog.compare_with_simulation('mars', sim_time, 10)
+
+    # CLI render (needs matplotlib and ffmpeg)
+    try:
+        import main
+    except ImportError as e:
+        print(f"Skipping main.render: {e}", file=sys.stderr)
+        return
+    if not shutil.which('ffmpeg'):
+        print("Skipping main.render: ffmpeg not found", file=sys.stderr)
+        return
+    steps = 20 if quick else 50
+    positions = main.compute_positions('mars', steps)
+    output = os.path.join(tempfile.mkdtemp(), 'bench.mp4')
+    yield f'main.render.{steps}', steps, lambda: main.render_parallel('mars', positions, steps, 50, output)
+
+def measure(fn, repeat=5, min_time=0.2):
+    """Best/median seconds per call, plus tracemalloc peak and net bytes for one call"""
+    timer = timeit.Timer(fn)
+    number, elapsed = timer.autorange()
+    number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    times = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    fn()
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'seconds': min(times),
+        'seconds_median': statistics.median(times),
+        'calls': number * repeat,
+        'peak_bytes': peak - before,
+        'net_bytes': after - before
+    }
+
+def run(quick=False, pattern=None, repeat=5, verbose=True):
+    """Run every matching case; returns the JSON-ready report"""
+    results = {}
+    for name, items, fn in cases(quick):
+        if pattern and pattern not in name:
+            continue
+        row = measure(fn, repeat=3 if quick else repeat)
+        row['items'] = items
+        row['throughput'] = items / row['seconds']
+        results[name] = row
+        if verbose:
+            print(f"{name:42} {row['seconds'] * 1e3:10.3f} ms  {row['throughput']:12.1f} items/s  "
+                  f"peak {row['peak_bytes'] / 1024:10.1f} KiB")
+    return {
+        'meta': {
+            'timestamp': time.time(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'quick': quick
+        },
+        'results': results
+    }
+
+def compare(report, baseline, threshold=0.2):
+    """Cases whose time or peak memory grew by more than threshold over the baseline"""
+    regressions = []
+    for name, row in report['results'].items():
+        base = baseline['results'].get(name)
+        if not base:
+            continue
+        for metric in ('seconds', 'peak_bytes'):
+            # Ignore tiny absolute peaks where allocator noise dominates
+            if metric == 'peak_bytes' and max(row[metric], base[metric]) < 64 * 1024:
+                continue
+            ratio = row[metric] / base[metric] if base[metric] else float('inf')
+            if ratio > 1 + threshold:
+                regressions.append({'case': name, 'metric': metric, 'baseline': base[metric],
+                                    'current': row[metric], 'ratio': ratio})
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Rocket Simulation benchmarks')
+    parser.add_argument('--save', nargs='?', const=DEFAULT_BASELINE, help='Write results as a baseline')
+    parser.add_argument('--compare', nargs='?', const=DEFAULT_BASELINE, help='Compare against a baseline')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed slowdown before flagging (0.2 = 20%%)')
+    parser.add_argument('--filter', help='Only run cases whose name contains this')
+    parser.add_argument('--quick', action='store_true', help='Smaller sizes and fewer repeats')
+    args = parser.parse_args(argv)
+
+    report = run(args.quick, args.filter)
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        for r in regressions:
+            print(f"REGRESSION {r['case']}: {r['metric']} {r['baseline']:.6g} -> {r['current']:.6g} ({r['ratio']:.2f}x)")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} against {args.compare}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
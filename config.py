@@ -3,20 +3,89 @@
 # Server settings
 HOST = '127.0.0.1'
 PORT = 5000
-DEBUG = True
+DEBUG = True  # development server (python app.py) only; serve.py never enables the debugger
+
+# Production server settings (serve.py)
+SERVER_WORKERS = 0  # worker processes, 0 = one per CPU core
+SERVER_THREADS = 16  # request threads per gunicorn worker, shared by SSE streams and other routes
+SERVER_GRACEFUL_TIMEOUT = 30  # seconds to drain in-flight requests on shutdown
+PREWARM_STEPS = (100, 200)  # trajectory step counts cached for every planet at worker boot
 
 # Simulation limits
 MAX_STEPS = 1000
 MIN_STEPS = 50
 DEFAULT_STEPS = 200
+MAX_BATCH_JOBS = 50  # jobs per /simulate-batch request
+TRAJECTORY_ENGINES = ('analytic', 'nbody')  # closed-form Hohmann or N-body propagation
+
+# Trajectory cache settings
+TRAJECTORY_CACHE_SIZE = 128  # cached (target, steps) results
 
 # Mission tracking settings
 TRACKING_UPDATE_INTERVAL = 1000  # milliseconds
 TIME_SCALE = 10  # 1 second = 10 days
+TRACKER_ARCHIVE_SIZE = 1000  # completed missions kept for status lookups
+TRACKER_PAGE_SIZE = 100  # missions per /active-missions page
+STREAM_MAX_SUBSCRIBERS = 200  # concurrent /mission-stream clients
+STREAM_RESERVED_THREADS = 4  # request threads per worker never held by streams when the server has a fixed pool
+STREAM_QUEUE_SIZE = 8  # buffered events per client before resyncing
+
+# Launch window settings
+PORKCHOP_CACHE_DIR = 'results/porkchop'  # on-disk grid cache, None to disable
+PORKCHOP_CACHE_MAX_FILES = 256  # cached grids kept on disk, least recently used deleted first
+PORKCHOP_MAX_GRID = 500  # max departures or flight times per axis
+PORKCHOP_MAX_SPAN_DAYS = 3650  # max departure window
+PORKCHOP_MAX_TOF_DAYS = 20000  # max time of flight (covers a slow Neptune transfer)
+
+# Ephemeris settings
+EPHEMERIS_CACHE_DIR = 'results/ephemeris'  # memory-mapped state tables, None to keep in memory
+EPHEMERIS_START = '2000-01-01'
+EPHEMERIS_END = '2050-01-01'  # mean elements are valid 1800-2050
+EPHEMERIS_STEP_DAYS = 1.0
+
+# Gravity assist route search
+ROUTE_SEARCH_MAX_DEPTH = 8  # intermediate flybys
+ROUTE_SEARCH_WORKERS = 4  # shared process pool size for large searches
+ROUTE_SEARCH_PARALLEL_THRESHOLD = 5000  # bodies ** depth above which subtrees run on the pool (3 ** 8 = 6561)
+
+# Monte Carlo dispersion settings
+MONTE_CARLO_MAX_SAMPLES = 1000000  # per /dispersion request
+MONTE_CARLO_CHUNK_SIZE = 100000  # samples per vectorized chunk
+
+# Mission catalog settings
+MISSION_CATALOG_DIR = 'results/missions'  # imported catalogs, loaded by every worker; None keeps imports in memory
+MISSION_PAGE_SIZE = 100  # missions per /missions page
+MISSION_IMPORT_MAX_BYTES = 16 * 1024 * 1024  # largest /missions/import upload
+MISSION_IMPORT_MAX_ROWS = 100000  # missions per /missions/import upload
+MISSION_IMPORT_TOKEN = None  # bearer token required by /missions/import, None allows any client
+HISTORICAL_COMPARISON_LIMIT = 10  # nearest historical missions attached to each simulation (None = all)
+
+# Background job settings (heavy routes called with ?async=1)
+JOB_WORKERS = 2  # job processes, the most heavy computations running at once per server worker
+JOB_MAX_PENDING = 100  # queued jobs before submissions are refused with 503
+JOB_TIMEOUT = 300  # seconds a job may run before its process is stopped
+JOB_HISTORY_SIZE = 1000  # finished jobs kept for status and result lookups
+JOB_RESULT_TTL = 600  # seconds a finished job's result stays available
+JOB_MAX_WAIT = 30  # longest /jobs/<id>/result?wait= long poll, seconds
+JOB_DIR = 'results/jobs'  # job state and results shared by every server worker, None keeps them per process
+
+# Persistence settings
+DATABASE_PATH = 'results/rocket_sim.db'  # SQLite (WAL) analytics and mission store
+STORE_BATCH_SIZE = 500  # rows per background commit
+STORE_HISTORY_LIMIT = 10000  # analytics rows kept after compaction
+
+# HTTP caching for static-data endpoints
+STATIC_CACHE_MAX_AGE = 3600  # seconds clients and proxies may reuse tutorials, quizzes and presets
+
+# Instrumentation settings
+METRICS_QUANTILES = (0.5, 0.9, 0.99, 0.999)  # latency quantiles exported at /metrics
+METRICS_PROFILE_SAMPLE_RATE = 0.0  # fraction of requests run under cProfile, 0 disables
+METRICS_PROFILE_TOP = 30  # functions listed at /metrics/profile
 
 # Spacecraft design limits
 MAX_MASS = 50000  # kg
 MAX_COST = 100000000  # $100M
+DESIGN_MAX_COMBINATIONS = 5000000  # component combinations per /optimize-design request
 
 # Planet data
 PLANETS = {
@@ -32,5 +101,11 @@ FEATURES = {
     'gravity_assist': True,
     'mission_database': True,
     'mission_tracker': True,
-    'spacecraft_designer': True
+    'spacecraft_designer': True,
+    'persistence': True,
+    'ephemeris': True,
+    'tutorials': True,
+    'analytics': True,
+    'jobs': True,
+    'metrics': True
 }
\ No newline at end of file
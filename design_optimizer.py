@@ -0,0 +1,167 @@
+import math
+import numpy as np
+from spacecraft_designer import BASE_COST, BASE_MASS, ENGINE_BONUS, POWER_BONUS, mass_score
+
+# Component category -> design config key, and the numeric attributes each option needs
+CATEGORIES = {
+    'engines': ('engine', ('isp', 'mass', 'cost')),
+    'fuel_tanks': ('fuel_tank', ('capacity', 'mass', 'cost')),
+    'power': ('power', ('mass', 'cost')),
+    'payload': ('payload', ('mass', 'cost'))
+}
+SORT_KEYS = {
+    'delta_v': -1,  # descending
+    'performance_rating': -1,
+    'total_cost': 1,
+    'wet_mass': 1
+}
+
+def _non_negative(value):
+    return (isinstance(value, (int, float)) and not isinstance(value, bool)
+            and math.isfinite(value) and value >= 0)
+
+class DesignOptimizer:
+    """Score every engine x tank x power x payload combination with array math
+
+    Component attributes are gathered into NumPy arrays once per catalog, and
+    the combination space is walked in flat-index chunks. The Pareto front
+    (min cost, min wet mass, max delta-v) and the top-k list are merged chunk by
+    chunk, so memory stays bounded however large a user catalog gets.
+    """
+
+    def __init__(self, designer, fuel_calc, max_mass=50000, max_cost=100000000, max_combinations=5000000):
+        self.designer = designer
+        self.fuel_calc = fuel_calc
+        self.max_mass = max_mass
+        self.max_cost = max_cost
+        self.max_combinations = max_combinations
+
+    def catalog_arrays(self, catalog=None, fixed=None):
+        """Option names and attribute arrays per category, with user catalog entries merged in"""
+        catalog = {} if catalog is None else catalog
+        fixed = {} if fixed is None else fixed
+        if not isinstance(catalog, dict) or not all(isinstance(v, dict) for v in catalog.values()):
+            raise ValueError('catalog must map component categories to named options')
+        unknown = [c for c in catalog if c not in CATEGORIES]
+        if unknown:
+            raise ValueError(f"Unknown component categories: {', '.join(map(str, unknown))}")
+        if not isinstance(fixed, dict) or not all(isinstance(v, str) for v in fixed.values()):
+            raise ValueError('fixed must map config keys to option names')
+
+        arrays = {}
+        for category, (config_key, attributes) in CATEGORIES.items():
+            options = {**self.designer.components[category], **catalog.get(category, {})}
+            if config_key in fixed:
+                if fixed[config_key] not in options:
+                    raise ValueError(f'Unknown {config_key}: {fixed[config_key]}')
+                options = {fixed[config_key]: options[fixed[config_key]]}
+            for name, option in options.items():
+                if not isinstance(option, dict):
+                    raise ValueError(f"{category} option '{name}' must be an object")
+                invalid = [a for a in attributes if not _non_negative(option.get(a))]
+                if invalid:
+                    raise ValueError(f"{category} option '{name}' needs finite, non-negative {', '.join(invalid)}")
+            names = list(options)
+            arrays[category] = {'names': names, **{a: np.array([options[n][a] for n in names], dtype=float)
+                                                   for a in attributes}}
+        arrays['engines']['bonus'] = np.array([ENGINE_BONUS.get(n, 0) for n in arrays['engines']['names']])
+        arrays['power']['bonus'] = np.array([POWER_BONUS.get(n, 0) for n in arrays['power']['names']])
+        return arrays
+
+    def validate(self, catalog=None, fixed=None, sort_by='delta_v'):
+        """Check a request up front (raises ValueError) and return its catalog arrays"""
+        if sort_by not in SORT_KEYS:
+            raise ValueError(f'sort_by must be one of {", ".join(SORT_KEYS)}')
+        arrays = self.catalog_arrays(catalog, fixed)
+        total = int(np.prod([len(arrays[c]['names']) for c in CATEGORIES]))
+        if total > self.max_combinations:
+            raise ValueError(f'{total} combinations exceeds the limit of {self.max_combinations}')
+        return arrays
+
+    def evaluate(self, arrays, indices):
+        """Objectives for combinations given as an (n, 4) array of per-category option indices"""
+        engine, tank, power, payload = (arrays[c] for c in CATEGORIES)
+        e, t, p, l = indices.T
+        total_mass = BASE_MASS + engine['mass'][e] + tank['mass'][t] + power['mass'][p] + payload['mass'][l]
+        fuel = tank['capacity'][t]
+        return {
+            'total_mass': total_mass,
+            'wet_mass': total_mass + fuel,
+            'total_cost': BASE_COST + engine['cost'][e] + tank['cost'][t] + power['cost'][p] + payload['cost'][l],
+            'delta_v': self.fuel_calc.delta_v_capacity(total_mass, fuel, engine['isp'][e]),
+            'performance_rating': np.clip(50 + engine['bonus'][e] + mass_score(total_mass) + power['bonus'][p], 0, 100)
+        }
+
+    def optimize(self, catalog=None, fixed=None, min_delta_v=0, top_k=10, sort_by='delta_v', chunk_size=65536):
+        """Pareto front and top-k designs within max_mass and max_cost"""
+        arrays = self.validate(catalog, fixed, sort_by)
+        shape = tuple(len(arrays[c]['names']) for c in CATEGORIES)
+        total = int(np.prod(shape))
+
+        front = np.empty((0, len(shape)), dtype=int)
+        best = np.empty((0, len(shape)), dtype=int)
+        feasible = 0
+        for start in range(0, total, chunk_size):
+            indices = np.stack(np.unravel_index(np.arange(start, min(start + chunk_size, total)), shape), axis=1)
+            scores = self.evaluate(arrays, indices)
+            keep = ((scores['wet_mass'] <= self.max_mass) & (scores['total_cost'] <= self.max_cost)
+                    & (scores['delta_v'] >= min_delta_v))
+            indices = indices[keep]
+            feasible += len(indices)
+
+            # Merge this chunk into the running front and the running top-k
+            front = np.concatenate([front, indices])
+            front = front[pareto_mask(self._objectives(arrays, front))]
+            best = np.concatenate([best, indices])
+            key = SORT_KEYS[sort_by] * self.evaluate(arrays, best)[sort_by]
+            if len(best) > top_k:
+                best = best[np.argpartition(key, top_k - 1)[:top_k]]
+
+        key = SORT_KEYS[sort_by] * self.evaluate(arrays, best)[sort_by]
+        best = best[np.argsort(key, kind='stable')]
+        front = front[np.argsort(self.evaluate(arrays, front)['total_cost'], kind='stable')]
+        return {
+            'evaluated': total,
+            'feasible': feasible,
+            'pareto_front': self._designs(arrays, front),
+            'top': self._designs(arrays, best),
+            'sort_by': sort_by
+        }
+
+    def _objectives(self, arrays, indices):
+        scores = self.evaluate(arrays, indices)
+        return np.stack([scores['total_cost'], scores['wet_mass'], -scores['delta_v']], axis=1)
+
+    def _designs(self, arrays, indices):
+        scores = self.evaluate(arrays, indices)
+        designs = []
+        for row, combo in enumerate(indices.tolist()):
+            design = {'config': {CATEGORIES[c][0]: arrays[c]['names'][i] for c, i in zip(CATEGORIES, combo)}}
+            design.update({k: float(v[row]) for k, v in scores.items()})
+            design['fuel_capacity'] = float(arrays['fuel_tanks']['capacity'][combo[1]])
+            designs.append(design)
+        return designs
+
+def dominated(by, candidates):
+    """Mask of candidates that some row of `by` dominates (all objectives minimized)"""
+    no_worse = (by[:, None, :] <= candidates[None, :, :]).all(axis=2)
+    better = (by[:, None, :] < candidates[None, :, :]).any(axis=2)
+    return (no_worse & better).any(axis=0)
+
+def pareto_mask(objectives, block_size=256):
+    """Boolean mask of the non-dominated rows
+
+    Rows are swept in lexicographic order, where a dominating row always sorts
+    first. Each block's survivors are final, and everything they dominate is
+    pruned from the rows still to visit, so most rows are never compared pairwise.
+    """
+    order = np.lexsort(objectives.T[::-1])
+    keep = np.zeros(len(objectives), dtype=bool)
+    while len(order):
+        rows, order = order[:block_size], order[block_size:]
+        block = objectives[rows]
+        survivors = ~dominated(block, block)
+        keep[rows[survivors]] = True
+        if len(order) and survivors.any():
+            order = order[~dominated(block[survivors], objectives[order])]
+    return keep
@@ -0,0 +1,143 @@
+import hashlib
+import os
+from datetime import datetime
+import numpy as np
+from orbital_mechanics import AU_KM
+
+J2000 = datetime(2000, 1, 1, 12)
+SECONDS_PER_DAY = 86400
+
+# Mean ecliptic elements at J2000 and rates per Julian century (Standish, JPL approximate
+# positions, valid 1800-2050): a (AU), e, I, L, long. perihelion, long. ascending node (deg)
+ELEMENTS = {
+    'venus': ((0.72333566, 0.00677672, 3.39467605, 181.97909950, 131.60246718, 76.67984255),
+              (0.00000390, -0.00004107, -0.00078890, 58517.81538729, 0.00268329, -0.27769418)),
+    'earth': ((1.00000261, 0.01671123, -0.00001531, 100.46457166, 102.93768193, 0.0),
+              (0.00000562, -0.00004392, -0.01294668, 35999.37244981, 0.32327364, 0.0)),
+    'mars': ((1.52371034, 0.09339410, 1.84969142, -4.55343205, -23.94362959, 49.55953891),
+             (0.00001847, 0.00007882, -0.00813131, 19140.30268499, 0.44441088, -0.29257343)),
+    'jupiter': ((5.20288700, 0.04838624, 1.30439695, 34.39644051, 14.72847983, 100.47390909),
+                (-0.00011607, -0.00013253, -0.00183714, 3034.74612775, 0.21252668, 0.20469106))
+}
+
+def kepler_state(body, days):
+    """Heliocentric ecliptic position (AU) and velocity (AU/day) from mean elements, days since J2000"""
+    days = np.asarray(days, dtype=float)
+    elements, rates = (np.array(v) for v in ELEMENTS[body])
+    a, e, inc, L, peri, node = (elements[:, None] + rates[:, None] * (days.ravel() / 36525)[None, :])
+    inc, node = np.radians(inc), np.radians(node)
+    omega = np.radians(peri) - node
+    M = np.radians((L - peri + 180) % 360 - 180)
+
+    # Newton iteration on Kepler's equation, vectorized over epochs
+    E = M + e * np.sin(M)
+    for _ in range(8):
+        E -= (E - e * np.sin(E) - M) / (1 - e * np.cos(E))
+
+    n = np.radians(rates[3]) / 36525  # mean motion, rad/day
+    E_dot = n / (1 - e * np.cos(E))
+    b = a * np.sqrt(1 - e**2)
+    orbital = np.stack([a * (np.cos(E) - e), b * np.sin(E)])
+    orbital_dot = np.stack([-a * np.sin(E) * E_dot, b * np.cos(E) * E_dot])
+
+    # Rotate from the orbital plane into the ecliptic frame
+    cw, sw, cn, sn, ci, si = np.cos(omega), np.sin(omega), np.cos(node), np.sin(node), np.cos(inc), np.sin(inc)
+    rotation = np.array([
+        [cw * cn - sw * sn * ci, -sw * cn - cw * sn * ci],
+        [cw * sn + sw * cn * ci, -sw * sn + cw * cn * ci],
+        [sw * si, cw * si]
+    ])
+    position = np.einsum('ijn,jn->ni', rotation, orbital)
+    velocity = np.einsum('ijn,jn->ni', rotation, orbital_dot)
+    return position.reshape(days.shape + (3,)), velocity.reshape(days.shape + (3,))
+
+class Ephemeris:
+    """Tabulated planet states with cubic Hermite interpolation
+
+    Positions and velocities from the mean elements are sampled every `step` days
+    into a (bodies, samples, 6) float64 .npy file, memory-mapped on later runs.
+    Queries only touch the two bracketing samples, so any number of epochs costs
+    a gather and a cubic instead of a Kepler solve.
+    """
+
+    def __init__(self, cache_dir=None, start=datetime(2000, 1, 1), end=datetime(2050, 1, 1), step=1.0,
+                 bodies=tuple(ELEMENTS)):
+        self.bodies = list(bodies)
+        self.index = {body: i for i, body in enumerate(self.bodies)}
+        self.step = step
+        self.t0 = (start - J2000).total_seconds() / SECONDS_PER_DAY
+        self.samples = int(np.ceil(((end - start).total_seconds() / SECONDS_PER_DAY) / step)) + 1
+        self.t1 = self.t0 + (self.samples - 1) * step
+        params = f"{','.join(self.bodies)}|{start:%Y-%m-%d}|{end:%Y-%m-%d}|{step}"
+        self.cache_key = hashlib.sha256(params.encode()).hexdigest()[:16]
+        self.cache_file = os.path.join(cache_dir, self.cache_key + '.npy') if cache_dir else None
+        self.table = self._load() if self.cache_file and os.path.exists(self.cache_file) else self._build()
+
+    def _load(self):
+        return np.load(self.cache_file, mmap_mode='r')
+
+    def _build(self):
+        days = self.t0 + np.arange(self.samples) * self.step
+        if self.cache_file:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            tmp_file = f'{self.cache_file}.{os.getpid()}.tmp'  # workers may build concurrently
+            table = np.lib.format.open_memmap(tmp_file, mode='w+', dtype='<f8',
+                                              shape=(len(self.bodies), self.samples, 6))
+        else:
+            table = np.empty((len(self.bodies), self.samples, 6))
+        for i, body in enumerate(self.bodies):
+            position, velocity = kepler_state(body, days)
+            table[i, :, :3] = position
+            table[i, :, 3:] = velocity
+        if not self.cache_file:
+            return table
+        table.flush()
+        del table
+        os.replace(tmp_file, self.cache_file)
+        return self._load()
+
+    def days(self, date):
+        """Days since J2000 for a datetime"""
+        return (date - J2000).total_seconds() / SECONDS_PER_DAY
+
+    def covers(self, body, days):
+        """True when body is tabulated and every epoch (days since J2000) lies in the span"""
+        days = np.asarray(days, dtype=float)
+        return body in self.index and (not days.size or (days.min() >= self.t0 and days.max() <= self.t1))
+
+    def state(self, body, days):
+        """Position (AU) and velocity (AU/day) of body at days since J2000 (scalar or array)"""
+        if body not in self.index:
+            raise ValueError(f'No ephemeris for {body}')
+        days = np.asarray(days, dtype=float)
+        if not self.covers(body, days):
+            raise ValueError('Epoch outside the ephemeris span')
+
+        u = (days - self.t0) / self.step
+        i = np.minimum(u.astype(int), self.samples - 2)
+        s = (u - i)[..., None]
+        table = self.table[self.index[body]]
+        left, right = table[i], table[i + 1]
+        p0, v0 = left[..., :3], left[..., 3:] * self.step
+        p1, v1 = right[..., :3], right[..., 3:] * self.step
+
+        s2, s3 = s * s, s * s * s
+        position = (2*s3 - 3*s2 + 1) * p0 + (s3 - 2*s2 + s) * v0 + (-2*s3 + 3*s2) * p1 + (s3 - s2) * v1
+        velocity = ((6*s2 - 6*s) * p0 + (3*s2 - 4*s + 1) * v0 + (-6*s2 + 6*s) * p1 + (3*s2 - 2*s) * v1) / self.step
+        return position, velocity
+
+    def state_km(self, body, days):
+        """Position (km) and velocity (km/s) of body at days since J2000"""
+        position, velocity = self.state(body, days)
+        return position * AU_KM, velocity * AU_KM / SECONDS_PER_DAY
+
+    def stats(self):
+        """Get ephemeris table statistics"""
+        return {
+            'bodies': self.bodies,
+            'samples': self.samples,
+            'step_days': self.step,
+            'bytes': int(self.table.nbytes),
+            'memory_mapped': isinstance(self.table, np.memmap),
+            'cache_file': self.cache_file
+        }
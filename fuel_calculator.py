@@ -1,4 +1,16 @@
 import numpy as np
+from launch_optimizer import launch_timing
+from orbital_mechanics import MU_SUN_KM, hohmann_delta_v
+
+# One-sigma dispersions for Monte Carlo fuel budgets
+DEFAULT_DISPERSIONS = {
+    'isp_sigma': 5.0,  # seconds
+    'dry_mass_sigma': 0.02,  # fraction of dry mass
+    'launch_offset_sigma': 10.0,  # days from the optimal window
+    'burn_error_sigma': 0.01  # fractional delta-v execution error per burn
+}
+DISPERSION_METRICS = ('total_dv', 'fuel_mass', 'total_mass')
+PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
 
 class FuelCalculator:
     def __init__(self):
@@ -7,26 +19,9 @@ class FuelCalculator:
         self.isp = 450  # specific impulse (seconds)
         self.g0 = 9.81  # standard gravity
         
-    def delta_v_hohmann(self, r1, r2, mu=1.327e11):  # mu for Sun in km³/s²
-        """Calculate delta-v for Hohmann transfer"""
-        # Convert AU to km
-        r1_km = r1 * 149.6e6
-        r2_km = r2 * 149.6e6
-        
-        # Velocities
-        v1 = np.sqrt(mu / r1_km)
-        v2 = np.sqrt(mu / r2_km)
-        
-        # Transfer orbit
-        a_transfer = (r1_km + r2_km) / 2
-        v_transfer_1 = np.sqrt(mu * (2/r1_km - 1/a_transfer))
-        v_transfer_2 = np.sqrt(mu * (2/r2_km - 1/a_transfer))
-        
-        # Delta-v requirements
-        dv1 = abs(v_transfer_1 - v1)  # Departure burn
-        dv2 = abs(v2 - v_transfer_2)  # Arrival burn
-        
-        return dv1/1000, dv2/1000  # Convert to km/s
+    def delta_v_hohmann(self, r1, r2, mu=MU_SUN_KM):  # mu for Sun in km³/s²
+        """Calculate delta-v (km/s) for Hohmann transfer between radii in AU"""
+        return hohmann_delta_v(r1, r2, mu)
     
     def fuel_mass(self, delta_v):
         """Calculate fuel mass using rocket equation"""
@@ -35,8 +30,13 @@ class FuelCalculator:
         fuel_mass = total_mass - self.dry_mass
         return fuel_mass
     
+    def delta_v_capacity(self, dry_mass, fuel_mass, isp=None):
+        """Delta-v (km/s) from burning fuel_mass, the inverse of fuel_mass (scalar or array)"""
+        isp = self.isp if isp is None else isp
+        return isp * self.g0 * np.log1p(np.asarray(fuel_mass) / dry_mass) / 1000
+    
     def mission_fuel(self, target_distance):
-        """Calculate total mission fuel requirements"""
+        """Calculate total mission fuel requirements (scalar or array of distances)"""
         dv1, dv2 = self.delta_v_hohmann(1.0, target_distance)
         total_dv = dv1 + dv2
         
@@ -49,4 +49,48 @@ class FuelCalculator:
             'fuel_mass': fuel_needed,
             'total_mass': self.dry_mass + fuel_needed,
             'fuel_ratio': fuel_needed / (self.dry_mass + fuel_needed)
-        }
\ No newline at end of file
+        }
+    
+    def mission_fuel_dispersion(self, target_distance, samples=100000, seed=None, dispersions=None,
+                                chunk_size=100000, bins=50):
+        """Monte Carlo fuel budget under Isp, dry mass, launch timing and burn execution dispersions
+        
+        Samples are drawn in vectorized chunks, each from its own child of one
+        SeedSequence, so a given seed always reproduces the same result. Chunks
+        run inline; large runs belong on the job pool (/dispersion?async=1).
+        """
+        dispersions = {**DEFAULT_DISPERSIONS, **(dispersions or {})}
+        dv1, dv2 = self.delta_v_hohmann(1.0, target_distance)
+        nominal = (float(dv1), float(dv2), self.isp, self.dry_mass, self.g0)
+        
+        sizes = [min(chunk_size, samples - start) for start in range(0, samples, chunk_size)]
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        chunks = [_dispersion_chunk(nominal, dispersions, s, n) for s, n in zip(seeds, sizes)]
+        
+        report = {'samples': samples, 'seed': seed, 'dispersions': dispersions}
+        for metric in DISPERSION_METRICS:
+            values = np.concatenate([chunk[metric] for chunk in chunks])
+            counts, edges = np.histogram(values, bins=bins)
+            report[metric] = {
+                'nominal': float(self.mission_fuel(target_distance)[metric]),
+                'mean': float(values.mean()),
+                'std': float(values.std()),
+                'percentiles': dict(zip((f'p{p}' for p in PERCENTILES), np.percentile(values, PERCENTILES).tolist())),
+                'histogram': {'counts': counts.tolist(), 'edges': edges.tolist()}
+            }
+        return report
+
+def _dispersion_chunk(nominal, dispersions, seed, size):
+    """Sample one chunk of dispersed missions"""
+    dv1, dv2, isp, dry_mass, g0 = nominal
+    rng = np.random.default_rng(seed)
+    isp = rng.normal(isp, dispersions['isp_sigma'], size)
+    dry_mass = dry_mass * (1 + rng.normal(0, dispersions['dry_mass_sigma'], size))
+    _, penalty = launch_timing(rng.normal(0, dispersions['launch_offset_sigma'], size))
+    
+    # Independent execution errors on the departure and arrival burns
+    burn_sigma = dispersions['burn_error_sigma']
+    total_dv = dv1 * (1 + rng.normal(0, burn_sigma, size)) + dv2 * (1 + rng.normal(0, burn_sigma, size))
+    
+    fuel_mass = dry_mass * np.expm1(total_dv * 1000 / (isp * g0)) * (1 + penalty)
+    return {'total_dv': total_dv, 'fuel_mass': fuel_mass, 'total_mass': dry_mass + fuel_mass}
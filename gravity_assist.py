@@ -1,4 +1,9 @@
+import bisect
+import heapq
+import multiprocessing
+import threading
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 
 class GravityAssist:
     def __init__(self):
@@ -8,9 +13,16 @@ class GravityAssist:
             'mars': {'distance': 1.524, 'mass': 6.42e23, 'radius': 3390},
             'jupiter': {'distance': 5.204, 'mass': 1.90e27, 'radius': 69911}
         }
+        self._flyby_cache = {}
+        self._pool = None  # shared subtree pool, started by the first parallel search
+        self._pool_lock = threading.Lock()
         
     def flyby_velocity_change(self, planet, approach_velocity, flyby_altitude=1000):
         """Calculate velocity change from gravity assist"""
+        key = (planet, approach_velocity, flyby_altitude)
+        if key in self._flyby_cache:
+            return self._flyby_cache[key]
+        
         planet_data = self.planets[planet]
         mu = 6.674e-11 * planet_data['mass']  # GM
         r_p = (planet_data['radius'] + flyby_altitude) * 1000  # m
@@ -24,6 +36,7 @@ class GravityAssist:
         # Velocity change magnitude
         dv = 2 * v_inf * np.sin(delta / 2)
         
+        self._flyby_cache[key] = dv / 1000
         return dv / 1000  # km/s
     
     def multi_flyby_trajectory(self, route):
@@ -83,4 +96,97 @@ class GravityAssist:
             trajectory = self.multi_flyby_trajectory(route)
             suggested.append(trajectory)
         
-        return sorted(suggested, key=lambda x: x['total_dv'])
\ No newline at end of file
+        return sorted(suggested, key=lambda x: x['total_dv'])
+    
+    def search_routes(self, destination, max_depth=3, top_k=5, workers=1, parallel_threshold=5000):
+        """Search flyby sequences over all planets with branch-and-bound on cumulative delta-v
+        
+        Routes start at Earth, take up to max_depth intermediate flybys (any planet
+        except the destination) and end at the destination, scored as in
+        multi_flyby_trajectory. Independent first-hop subtrees go to a shared
+        process pool when the deepest level holds more than parallel_threshold
+        routes (bodies ** max_depth).
+        """
+        if destination not in self.planets:
+            raise ValueError(f'Unknown destination: {destination}')
+        
+        bodies = [p for p in self.planets if p != destination]
+        if workers > 1 and max_depth > 1 and len(bodies) ** max_depth > parallel_threshold:
+            pool = self._executor(workers)
+            futures = [pool.submit(_search_subtree, self.planets, destination, ['earth', body], max_depth, top_k)
+                       for body in bodies]
+            results = [_search_subtree(self.planets, destination, ['earth'], 0, top_k)]
+            results += [future.result() for future in futures]
+        else:
+            results = [self._branch_and_bound(destination, ['earth'], max_depth, top_k)]
+        
+        best = heapq.nsmallest(top_k, (entry for found, _ in results for entry in found))
+        return {
+            'routes': [self.multi_flyby_trajectory(list(route)) for _, _, route in best],
+            'nodes_explored': sum(stats['explored'] for _, stats in results),
+            'nodes_pruned': sum(stats['pruned'] for _, stats in results)
+        }
+    
+    def _executor(self, workers):
+        # One pool for the life of this object, spawned so no server thread's locks are inherited
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'))
+            return self._pool
+    
+    def close(self):
+        """Shut down the subtree pool, if one was started"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+    
+    def _branch_and_bound(self, destination, prefix, max_depth, top_k):
+        """Depth-first search below prefix, returning (best [(score, length, route)], stats)"""
+        bodies = [p for p in self.planets if p != destination]
+        max_index = max_depth + 1
+        v_launch = np.sqrt(2 * 6.674e-11 * 1.327e20 / (1.496e11)) / 1000
+        
+        # Best possible gain at each route position, for the optimistic bound
+        best_gain = [0] + [max(self.flyby_velocity_change(p, 15 + i * 5) for p in self.planets)
+                           for i in range(1, max_index + 1)]
+        remaining_gain = [sum(best_gain[i + 1:]) for i in range(max_index + 1)]
+        
+        cumulative = v_launch
+        for i, planet in enumerate(prefix[1:], start=1):
+            cumulative -= self.flyby_velocity_change(planet, 15 + i * 5)
+        
+        kept = []  # best (score, length, route) entries, ascending
+        stats = {'explored': 0, 'pruned': 0}
+        
+        def visit(route, cumulative):
+            stats['explored'] += 1
+            index = len(route)
+            
+            score = max(0, cumulative - self.flyby_velocity_change(destination, 15 + index * 5))
+            entry = (score, index + 1, tuple(route) + (destination,))
+            if len(kept) < top_k or entry < kept[-1]:
+                bisect.insort(kept, entry)
+                del kept[top_k:]
+            
+            if index > max_depth:
+                return
+            for body in bodies:
+                next_cumulative = cumulative - self.flyby_velocity_change(body, 15 + index * 5)
+                # No completion below this branch can rank ahead of its optimistic bound
+                bound = (max(0, next_cumulative - remaining_gain[index]), index + 2,
+                         tuple(route) + (body, destination))
+                if len(kept) == top_k and bound >= kept[-1]:
+                    stats['pruned'] += 1
+                    continue
+                visit(route + [body], next_cumulative)
+        
+        if len(prefix) <= max_index:
+            visit(list(prefix), cumulative)
+        return kept, stats
+
+def _search_subtree(planets, destination, prefix, max_depth, top_k):
+    """Process-pool entry point for one branch-and-bound subtree"""
+    assist = GravityAssist()
+    assist.planets = planets
+    return assist._branch_and_bound(destination, prefix, max_depth, top_k)
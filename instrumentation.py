@@ -0,0 +1,197 @@
+import cProfile
+import io
+import pstats
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+SUB_BUCKET_BITS = 5  # 16 sub-buckets per power of two, <= 6.25% relative error
+SUB_BUCKETS = 1 << (SUB_BUCKET_BITS - 1)
+MAX_BUCKETS = SUB_BUCKETS * 48  # nanoseconds up to ~2^47, about 39 hours
+
+def bucket_index(value):
+    """HDR-style log-linear bucket for a non-negative integer"""
+    if value < 2 * SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    return min(SUB_BUCKETS * shift + (value >> shift), MAX_BUCKETS - 1)
+
+def bucket_bounds(index):
+    """Smallest and largest value that land in a bucket"""
+    if index < 2 * SUB_BUCKETS:
+        return index, index
+    shift = index // SUB_BUCKETS - 1
+    lower = (index - SUB_BUCKETS * shift) << shift
+    return lower, lower + (1 << shift) - 1
+
+class LatencyHistogram:
+    """Streaming latency histogram in fixed memory
+
+    Durations (integer nanoseconds) fall into log-linear buckets, so recording
+    is a bit_length and an increment, and quantiles are accurate to a few
+    percent at any scale however many samples are recorded.
+    """
+
+    def __init__(self):
+        self.counts = [0] * MAX_BUCKETS
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self._lock = threading.Lock()
+
+    def record(self, nanoseconds):
+        index = bucket_index(nanoseconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += nanoseconds
+            if nanoseconds > self.max:
+                self.max = nanoseconds
+
+    def quantiles(self, qs):
+        """Nanosecond value at each quantile (bucket midpoint, capped at the max seen)"""
+        with self._lock:
+            counts, count, largest = list(self.counts), self.count, self.max
+        if not count:
+            return [0] * len(qs)
+        values = []
+        ranks = iter(sorted((max(1, int(q * count + 0.5)), i) for i, q in enumerate(qs)))
+        rank, slot = next(ranks)
+        seen = 0
+        for index, n in enumerate(counts):
+            seen += n
+            while seen >= rank:
+                lower, upper = bucket_bounds(index)
+                values.append((slot, min((lower + upper) / 2, largest)))
+                rank, slot = next(ranks, (None, None))
+                if rank is None:
+                    return [v for _, v in sorted(values)]
+        return [v for _, v in sorted(values)]
+
+class Metrics:
+    """Counters, latency histograms and a sampled profiler, rendered as Prometheus text
+
+    Timers use time.perf_counter_ns, so taking a measurement costs a clock read
+    and a histogram increment. Series are keyed by metric name plus a sorted
+    label tuple; collectors add values read from other subsystems at scrape time.
+    """
+
+    def __init__(self, prefix='rocket', quantiles=(0.5, 0.9, 0.99, 0.999), profile_sample_rate=0.0):
+        self.prefix = prefix
+        self.quantiles = quantiles
+        self.histograms = {}
+        self.counters = {}
+        self.help = {}
+        self.collectors = []
+        self.profile_sample_rate = profile_sample_rate
+        self.profiled_requests = 0
+        self._profile_stats = None
+        self._profiling = threading.Lock()
+        self._lock = threading.Lock()
+
+    def describe(self, name, kind, text):
+        self.help[name] = (kind, text)
+
+    def observe(self, name, nanoseconds, **labels):
+        """Record one duration in the named histogram"""
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(key, LatencyHistogram())
+        histogram.record(nanoseconds)
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Time the enclosed block into the named histogram"""
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter_ns() - start, **labels)
+
+    def add_collector(self, collector):
+        """Register fn() -> [(name, kind, help, labels, value)] evaluated on every scrape"""
+        self.collectors.append(collector)
+
+    def start_profile(self):
+        """A running cProfile for a sampled request, or None (one profiled request at a time)"""
+        if not self.profile_sample_rate or random.random() >= self.profile_sample_rate:
+            return None
+        if not self._profiling.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def stop_profile(self, profile):
+        profile.disable()
+        try:
+            if self._profile_stats is None:
+                self._profile_stats = pstats.Stats(profile)
+            else:
+                self._profile_stats.add(profile)
+            self.profiled_requests += 1
+        finally:
+            self._profiling.release()
+
+    def profile_report(self, limit=30, sort='cumulative'):
+        """Top functions across all sampled requests, as pstats text"""
+        if self._profile_stats is None:
+            return 'No requests profiled yet\n'
+        out = io.StringIO()
+        self._profile_stats.stream = out
+        self._profile_stats.sort_stats(sort).print_stats(limit)
+        return f'{self.profiled_requests} profiled requests\n' + out.getvalue()
+
+    def reset_profile(self):
+        with self._profiling:
+            self._profile_stats = None
+            self.profiled_requests = 0
+
+    def render(self):
+        """All series in the Prometheus text exposition format"""
+        series = {}
+        with self._lock:
+            histograms = list(self.histograms.items())
+            counters = list(self.counters.items())
+        for (name, labels), value in counters:
+            series.setdefault(name, []).append((labels, value))
+
+        lines = []
+        for name, rows in sorted(series.items()):
+            kind, text = self.help.get(name, ('counter', name))
+            lines += [f'# HELP {self.prefix}_{name} {text}', f'# TYPE {self.prefix}_{name} {kind}']
+            lines += [f'{self.prefix}_{name}{format_labels(labels)} {value}' for labels, value in rows]
+
+        by_name = {}
+        for (name, labels), histogram in histograms:
+            by_name.setdefault(name, []).append((labels, histogram))
+        for name, rows in sorted(by_name.items()):
+            _, text = self.help.get(name, ('summary', name))
+            full = f'{self.prefix}_{name}_seconds'
+            lines += [f'# HELP {full} {text}', f'# TYPE {full} summary']
+            for labels, histogram in rows:
+                for q, value in zip(self.quantiles, histogram.quantiles(self.quantiles)):
+                    lines.append(f'{full}{format_labels(labels + (("quantile", q),))} {value / 1e9:.9g}')
+                lines.append(f'{full}_sum{format_labels(labels)} {histogram.total / 1e9:.9g}')
+                lines.append(f'{full}_count{format_labels(labels)} {histogram.count}')
+
+        for collector in self.collectors:
+            for name, kind, text, labels, value in collector():
+                full = f'{self.prefix}_{name}'
+                lines += [f'# HELP {full} {text}', f'# TYPE {full} {kind}',
+                          f'{full}{format_labels(tuple(sorted(labels.items())))} {value}']
+        return '\n'.join(lines) + '\n'
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in labels)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + '}'
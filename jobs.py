@@ -0,0 +1,405 @@
+import json
+import multiprocessing
+import os
+import signal
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+
+FINISHED = ('done', 'failed', 'cancelled', 'timeout')
+POLL_INTERVAL = 0.1  # seconds between cancel/timeout checks while a job runs
+
+class Job:
+    __slots__ = ('id', 'kind', 'key', 'fn', 'args', 'on_done', 'state', 'submitted', 'started', 'finished',
+                 'result', 'error', 'error_type', 'cancel_requested', 'coalesced', 'done')
+
+    def __init__(self, kind, key, fn, args, on_done=None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.key = key
+        self.fn = fn
+        self.args = args
+        self.on_done = on_done  # on_done(result), called in this process on success
+        self.state = 'queued'
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.result = None
+        self.error = None
+        self.error_type = None
+        self.cancel_requested = False
+        self.coalesced = 0  # identical submissions answered with this job
+        self.done = threading.Event()
+
+    def to_dict(self):
+        end = self.finished or time.time()
+        return {
+            'job_id': self.id,
+            'kind': self.kind,
+            'state': self.state,
+            'submitted_at': self.submitted,
+            'queued_seconds': (self.started or end) - self.submitted,
+            'run_seconds': end - self.started if self.started else 0.0,
+            'coalesced': self.coalesced,
+            'error': self.error,
+            'error_type': self.error_type
+        }
+
+def _worker_main(conn):
+    """Job process loop: receive (fn, args), reply ('ok', result) or ('error', type, message)"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # the parent decides when jobs stop
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            break  # parent went away
+        if task is None:
+            break
+        fn, args = task
+        try:
+            reply = ('ok', fn(*args))
+        except Exception as e:
+            reply = ('error', type(e).__name__, str(e))
+        try:
+            conn.send(reply)
+        except (EOFError, OSError):
+            break
+
+def _pid_alive(pid):
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # exists, owned by another user
+    return True
+
+class JobWorker:
+    """One job process and the parent end of its pipe"""
+
+    def __init__(self, context):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (EOFError, OSError):
+            pass
+        self.process.join(1)
+        self.kill()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(1)
+        self.conn.close()
+
+class JobRunner:
+    """Bounded pool of job processes for computations too slow for a request thread
+
+    Each of the `workers` slots owns one process and a thread in this process
+    that feeds it queued jobs, so the web tier's threads only enqueue and look
+    up jobs. A job still queued or running when an identical one (same kind
+    and arguments) is submitted is shared rather than computed twice. Running
+    jobs are stopped for cancellation or timeout by terminating their process,
+    which the slot replaces. Processes start on the first submission.
+
+    With shared_dir, state and results are also written there as JSON, so
+    every server worker process can report, await and cancel any job.
+    """
+
+    def __init__(self, workers=2, max_pending=100, timeout=300, history_size=1000, result_ttl=600,
+                 shared_dir=None, dumps=json.dumps, start_method='spawn'):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.history_size = history_size
+        self.result_ttl = result_ttl
+        self.shared_dir = shared_dir
+        self.dumps = dumps
+        self.context = multiprocessing.get_context(start_method)
+        self.jobs = OrderedDict()  # id -> Job, oldest first
+        self.inflight = {}  # (kind, arguments) -> queued or running Job
+        self.queue = deque()
+        self.counts = dict.fromkeys(('submitted', 'coalesced', 'rejected') + FINISHED, 0)
+        self.running = 0
+        self._slots = []
+        self._closed = False
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        if shared_dir:
+            os.makedirs(shared_dir, exist_ok=True)
+            self.sweep()
+
+    def submit(self, kind, fn, args=(), on_done=None):
+        """Queue fn(*args) in a job process; returns (job, created), or (None, False) when the queue is full
+
+        fn must be a module-level function and args and the result picklable.
+        """
+        key = (kind, json.dumps(args, sort_keys=True, default=repr))
+        with self._lock:
+            job = self.inflight.get(key)
+            if job is not None:
+                job.coalesced += 1
+                self.counts['coalesced'] += 1
+                return job, False
+            if self._closed or len(self.queue) >= self.max_pending:
+                self.counts['rejected'] += 1
+                return None, False
+            job = Job(kind, key, fn, args, on_done)
+            self.jobs[job.id] = job
+            self.inflight[key] = job
+            self.queue.append(job)
+            self.counts['submitted'] += 1
+            if len(self._slots) < self.workers:
+                self._start_slot()
+            self._ready.notify()
+        self._publish(job)
+        return job, True
+
+    def _start_slot(self):
+        thread = threading.Thread(target=self._run_slot, name=f'job-slot-{len(self._slots)}', daemon=True)
+        self._slots.append(thread)
+        thread.start()
+
+    def _run_slot(self):
+        worker = None
+        while True:
+            with self._ready:
+                while not self.queue and not self._closed:
+                    self._ready.wait()
+                if self._closed:
+                    break
+                job = self.queue.popleft()
+                if self._cancel_marked(job):
+                    job.cancel_requested = True
+                else:
+                    job.state = 'running'
+                    job.started = time.time()
+                    self.running += 1
+            if job.cancel_requested:
+                self._finish(job, 'cancelled', error='Job cancelled')
+                continue
+            self._publish(job)
+
+            try:
+                if worker is None or not worker.process.is_alive():
+                    worker = JobWorker(self.context)
+            except Exception as e:
+                worker = None
+                state, result, error = 'failed', None, f'Could not start job process: {e}'
+            else:
+                state, result, error = self._execute(worker, job)
+            if worker and (state in ('cancelled', 'timeout') or error == 'Job process exited'):
+                worker.kill()
+                worker = None
+            with self._lock:
+                self.running -= 1
+            self._finish(job, state, result, error)
+        if worker:
+            worker.stop()
+
+    def _execute(self, worker, job):
+        """(state, result, error) once the job's process replies, dies, or the job is stopped"""
+        try:
+            worker.conn.send((job.fn, job.args))
+        except Exception as e:
+            return 'failed', None, f'Could not send job: {e}'
+        deadline = job.started + self.timeout
+        while True:
+            if job.cancel_requested or self._cancel_marked(job):
+                return 'cancelled', None, 'Job cancelled'
+            if time.time() > deadline:
+                return 'timeout', None, f'Job exceeded {self.timeout}s'
+            if worker.conn.poll(POLL_INTERVAL):
+                try:
+                    reply = worker.conn.recv()
+                except (EOFError, OSError):
+                    return 'failed', None, 'Job process exited'
+                if reply[0] == 'ok':
+                    return 'done', reply[1], None
+                job.error_type = reply[1]
+                return 'failed', None, reply[2]
+            if not worker.process.is_alive():
+                return 'failed', None, 'Job process exited'
+
+    def _finish(self, job, state, result=None, error=None):
+        job.state, job.result, job.error, job.finished = state, result, error, time.time()
+        job.fn = job.args = None
+        with self._lock:
+            if self.inflight.get(job.key) is job:
+                del self.inflight[job.key]
+            self.counts[state] += 1
+            self._trim()
+        if state == 'done' and job.on_done:
+            try:
+                job.on_done(result)
+            except Exception as e:
+                print(f"Warning: job {job.id} completion hook failed: {e}")
+        self._publish(job)
+        job.done.set()
+
+    def _trim(self):
+        # Forget the oldest finished jobs beyond history_size or result_ttl
+        cutoff = time.time() - self.result_ttl
+        for job in list(self.jobs.values()):
+            if len(self.jobs) <= self.history_size and (job.finished or time.time()) >= cutoff:
+                break
+            if job.state in FINISHED:
+                del self.jobs[job.id]
+                self._remove_files(job.id)
+
+    def get(self, job_id):
+        """Status dict for a job started by any worker sharing shared_dir, or None"""
+        job = self.jobs.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        record = self._read(job_id)
+        return record['job'] if record else None
+
+    def result(self, job_id, wait=0):
+        """(status, result) after waiting up to `wait` seconds for the job to finish; None if unknown"""
+        job = self.jobs.get(job_id)
+        if job is not None:
+            job.done.wait(wait)
+            return job.to_dict(), job.result
+        deadline = time.time() + wait
+        while True:
+            record = self._read(job_id)
+            if record is None or record['job']['state'] in FINISHED or time.time() >= deadline:
+                return (record['job'], record.get('result')) if record else None
+            time.sleep(POLL_INTERVAL)
+
+    def cancel(self, job_id):
+        """Cancel a queued or running job (shared by every coalesced caller); returns its status or None"""
+        with self._lock:
+            job = self.jobs.get(job_id)
+            dequeued = job is not None and job.state == 'queued' and not job.cancel_requested
+            if dequeued:
+                self.queue.remove(job)
+            if job is not None:
+                job.cancel_requested = job.state not in FINISHED
+        if job is not None:
+            if dequeued:
+                self._finish(job, 'cancelled', error='Job cancelled')
+            return job.to_dict()
+        status = self.get(job_id)
+        if status and status['state'] not in FINISHED:
+            open(self._path(job_id, 'cancel'), 'w').close()  # picked up by the owning worker
+        return status
+
+    def list(self, limit=100):
+        """Newest jobs known to this process, newest first"""
+        with self._lock:
+            jobs = list(self.jobs.values())[-limit:]
+        return [job.to_dict() for job in reversed(jobs)]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'running': self.running,
+                'queued': len(self.queue),
+                'max_pending': self.max_pending,
+                'timeout': self.timeout,
+                **self.counts
+            }
+
+    def metrics(self):
+        """Queue depth and job outcomes for /metrics"""
+        stats = self.stats()
+        rows = [
+            ('jobs_queued', 'gauge', 'Jobs waiting for a job process', {}, stats['queued']),
+            ('jobs_running', 'gauge', 'Jobs running in job processes', {}, stats['running']),
+            ('jobs_coalesced_total', 'counter', 'Submissions answered with an identical in-flight job', {},
+             stats['coalesced']),
+            ('jobs_rejected_total', 'counter', 'Submissions refused because the queue was full', {}, stats['rejected'])
+        ]
+        rows += [(f'jobs_{state}_total', 'counter', f'Jobs finished as {state}', {}, stats[state]) for state in FINISHED]
+        return rows
+
+    def close(self):
+        """Stop every slot, terminating running jobs; queued jobs are cancelled"""
+        with self._ready:
+            self._closed = True
+            pending = list(self.queue)
+            self.queue.clear()
+            running = [job for job in self.jobs.values() if job.state == 'running']
+            self._ready.notify_all()
+        for job in running:
+            job.cancel_requested = True
+        for job in pending:
+            self._finish(job, 'cancelled', error='Server shutting down')
+        for thread in self._slots:
+            thread.join(POLL_INTERVAL * 10)
+
+    def sweep(self):
+        """Delete shared files other workers can no longer clean up; returns how many
+
+        Removes anything older than result_ttl, unfinished jobs whose owning
+        process has exited, and cancel markers or temp files left behind.
+        """
+        cutoff = time.time() - self.result_ttl
+        removed = 0
+        for entry in os.scandir(self.shared_dir):
+            job_id, _, suffix = entry.name.partition('.')
+            try:
+                stale = entry.stat().st_mtime < cutoff
+                if not stale and suffix == 'json':
+                    record = self._read(job_id)
+                    stale = (record is not None and record['job']['state'] not in FINISHED
+                             and not _pid_alive(record.get('pid')))
+                elif not stale and suffix == 'cancel':
+                    stale = not os.path.exists(self._path(job_id, 'json'))
+                elif not stale and suffix.endswith('.tmp'):
+                    stale = not _pid_alive(int(suffix.split('.')[1]))
+                if stale:
+                    os.remove(entry.path)
+                    removed += 1
+            except (OSError, ValueError, IndexError):
+                pass  # changed under us by another worker
+        return removed
+
+    def _path(self, job_id, suffix):
+        return os.path.join(self.shared_dir, f'{job_id}.{suffix}')
+
+    def _publish(self, job):
+        if not self.shared_dir:
+            return
+        record = {'job': job.to_dict(), 'pid': os.getpid()}
+        if job.state == 'done':
+            record['result'] = job.result
+        path = self._path(job.id, 'json')
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        try:
+            with open(tmp_path, 'w') as f:
+                f.write(self.dumps(record))
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Warning: could not publish job {job.id}: {e}")
+
+    def _read(self, job_id):
+        if not self.shared_dir or not job_id.isalnum():
+            return None
+        try:
+            with open(self._path(job_id, 'json')) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _cancel_marked(self, job):
+        return bool(self.shared_dir) and os.path.exists(self._path(job.id, 'cancel'))
+
+    def _remove_files(self, job_id):
+        if self.shared_dir:
+            for suffix in ('json', 'cancel'):
+                try:
+                    os.remove(self._path(job_id, suffix))
+                except OSError:
+                    pass
@@ -1,25 +1,38 @@
+import hashlib
+import os
 import numpy as np
 from datetime import datetime, timedelta
+from orbital_mechanics import (AU_KM, DAYS_PER_YEAR, EARTH, MU_SUN_KM, PLANET_CONSTANTS, circular_velocity,
+                               synodic_period)
+
+J2000 = datetime(2000, 1, 1, 12)
+MAX_LAUNCH_DEVIATION = 30  # days from the optimal window before efficiency reaches zero
+MAX_FUEL_PENALTY = 0.2  # fuel penalty at zero efficiency
+
+def launch_timing(days_from_optimal):
+    """Launch efficiency (0-1) and fractional fuel penalty for an offset in days (scalar or array)"""
+    # Efficiency decreases linearly as we move away from optimal window
+    efficiency = np.maximum(0, 1 - np.abs(days_from_optimal) / MAX_LAUNCH_DEVIATION)
+    return efficiency, (1 - efficiency) * MAX_FUEL_PENALTY
 
 class LaunchOptimizer:
-    def __init__(self):
+    def __init__(self, cache_dir=None, ephemeris=None, cache_max_files=256):
+        # Mean longitude at J2000 (degrees) places each circular orbit in time
+        longitudes = {'venus': 181.980, 'mars': 355.433, 'jupiter': 34.351}
+        self.earth = {'name': 'earth', 'period': EARTH['period_days'], 'distance': EARTH['distance'],
+                      'longitude': 100.464}
         self.planets = {
-            'venus': {'period': 224.7, 'distance': 0.723},
-            'mars': {'period': 687.0, 'distance': 1.524}, 
-            'jupiter': {'period': 4333.0, 'distance': 5.204}
+            name: {'name': name, 'period': PLANET_CONSTANTS[name]['period_days'],
+                   'distance': PLANET_CONSTANTS[name]['distance'], 'longitude': longitude}
+            for name, longitude in longitudes.items()
         }
+        self.cache_dir = cache_dir
+        self.cache_max_files = cache_max_files  # least recently used grids beyond this are deleted
+        self.ephemeris = ephemeris  # date-accurate elliptical orbits when set
         
     def synodic_period(self, target):
         """Calculate synodic period between Earth and target planet"""
-        earth_period = 365.25
-        target_period = self.planets[target]['period']
-        
-        if target_period > earth_period:
-            synodic = 1 / (1/earth_period - 1/target_period)
-        else:
-            synodic = 1 / (1/target_period - 1/earth_period)
-            
-        return abs(synodic)
+        return float(synodic_period(self.earth['period'], self.planets[target]['period']))
     
     def next_launch_windows(self, target, num_windows=3):
         """Calculate next optimal launch windows"""
@@ -30,11 +43,7 @@ class LaunchOptimizer:
         for i in range(num_windows):
             launch_date = base_date + timedelta(days=i * synodic)
             
-            # Calculate transfer time
-            a_earth = 1.0
-            a_target = self.planets[target]['distance']
-            a_transfer = (a_earth + a_target) / 2
-            transfer_time = a_transfer**1.5 / 2 * 365.25
+            transfer_time = PLANET_CONSTANTS[target]['transfer_time'] * DAYS_PER_YEAR
             
             arrival_date = launch_date + timedelta(days=transfer_time)
             
@@ -49,15 +58,166 @@ class LaunchOptimizer:
     
     def launch_efficiency(self, target, days_from_optimal=0):
         """Calculate launch efficiency based on timing"""
-        # Efficiency decreases as we move away from optimal window
-        max_deviation = 30  # days
-        efficiency = max(0, 1 - abs(days_from_optimal) / max_deviation)
+        efficiency, fuel_penalty = launch_timing(days_from_optimal)
+        
+        return {
+            'efficiency': float(efficiency) * 100,
+            'fuel_penalty': float(fuel_penalty) * 100,
+            'recommended': bool(efficiency > 0.8)
+        }
+    
+    def planet_state(self, body, days, use_ephemeris=True):
+        """Heliocentric ecliptic-plane position (km) and velocity (km/s), days since J2000
+
+        Uses the ephemeris table when one covers the epochs, otherwise a circular orbit.
+        """
+        if use_ephemeris and self.ephemeris and self.ephemeris.covers(body['name'], days):
+            position, velocity = self.ephemeris.state_km(body['name'], days)
+            return position[..., :2], velocity[..., :2]
+        
+        a = body['distance'] * AU_KM
+        angle = np.radians(body['longitude']) + 2 * np.pi * np.asarray(days) / body['period']
+        speed = circular_velocity(body['distance'])
+        position = a * np.stack([np.cos(angle), np.sin(angle)], axis=-1)
+        velocity = speed * np.stack([-np.sin(angle), np.cos(angle)], axis=-1)
+        return position, velocity
+    
+    def solve_lambert(self, r1, r2, tof, iterations=60):
+        """Vectorized prograde single-revolution Lambert solver (universal variables, bisection)"""
+        r1_norm = np.linalg.norm(r1, axis=-1)
+        r2_norm = np.linalg.norm(r2, axis=-1)
+        cos_dtheta = np.clip(np.sum(r1 * r2, axis=-1) / (r1_norm * r2_norm), -1, 1)
+        dtheta = np.arccos(cos_dtheta)
+        cross = r1[..., 0] * r2[..., 1] - r1[..., 1] * r2[..., 0]
+        dtheta = np.where(cross < 0, 2 * np.pi - dtheta, dtheta)
+        A = np.sin(dtheta) * np.sqrt(r1_norm * r2_norm / (1 - cos_dtheta))
+        
+        def stumpff(z):
+            sz = np.sqrt(np.abs(z))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                C = np.where(z > 1e-8, (1 - np.cos(sz)) / z,
+                             np.where(z < -1e-8, (np.cosh(sz) - 1) / -z, 0.5))
+                S = np.where(z > 1e-8, (sz - np.sin(sz)) / sz**3,
+                             np.where(z < -1e-8, (np.sinh(sz) - sz) / sz**3, 1/6))
+            return C, S
+        
+        def y_of(z):
+            C, S = stumpff(z)
+            return r1_norm + r2_norm + A * (z * S - 1) / np.sqrt(C), C, S
         
-        # Convert to fuel penalty
-        fuel_penalty = (1 - efficiency) * 0.2  # Up to 20% fuel penalty
+        # Time of flight rises monotonically with z; y < 0 counts as too short
+        low = np.full(np.shape(tof), -4 * np.pi**2)
+        high = np.full(np.shape(tof), 4 * np.pi**2 - 1e-6)
+        for _ in range(iterations):
+            z = (low + high) / 2
+            y, C, S = y_of(z)
+            with np.errstate(invalid='ignore'):
+                t = ((np.maximum(y, 0) / C)**1.5 * S + A * np.sqrt(np.maximum(y, 0))) / np.sqrt(MU_SUN_KM)
+            too_short = (y < 0) | (t < tof)
+            low = np.where(too_short, z, low)
+            high = np.where(too_short, high, z)
+        
+        y, _, _ = y_of((low + high) / 2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            f = 1 - y / r1_norm
+            g = A * np.sqrt(y / MU_SUN_KM)
+            g_dot = 1 - y / r2_norm
+            v1 = (r2 - f[..., None] * r1) / g[..., None]
+            v2 = (g_dot[..., None] * r2 - r1) / g[..., None]
+        invalid = (y < 0) | ~np.isfinite(g) | (g == 0)
+        v1[invalid] = np.nan
+        v2[invalid] = np.nan
+        return v1, v2
+    
+    def porkchop(self, target, start_date=None, departure_span=None, tof_range=None,
+                 departures=100, tofs=100, chunk_size=64):
+        """Departure date x time-of-flight grid of launch C3 and arrival v-infinity"""
+        start_date = (start_date or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+        transfer_time = PLANET_CONSTANTS[target]['transfer_time'] * DAYS_PER_YEAR
+        departure_span = departure_span or self.synodic_period(target)
+        tof_range = tof_range or (0.5 * transfer_time, 1.5 * transfer_time)
+        
+        params = f"{target}|{start_date:%Y-%m-%d}|{departure_span}|{tof_range[0]}|{tof_range[1]}|{departures}|{tofs}"
+        epoch = (start_date - J2000).total_seconds() / 86400
+        span = [epoch, epoch + departure_span + tof_range[1]]
+        use_ephemeris = bool(self.ephemeris) and all(self.ephemeris.covers(body, span) for body in ('earth', target))
+        if use_ephemeris:
+            params += f"|ephemeris:{self.ephemeris.cache_key}"
+        cache_file = None
+        if self.cache_dir:
+            cache_file = os.path.join(self.cache_dir, hashlib.sha256(params.encode()).hexdigest()[:16] + '.npz')
+            if os.path.exists(cache_file):
+                os.utime(cache_file)  # mark as recently used for eviction
+                with np.load(cache_file) as cached:
+                    return self._porkchop_result(target, start_date, cached['departure_days'],
+                                                 cached['tof_days'], cached['c3'], cached['vinf_arrival'])
+        
+        departure_days = np.linspace(0, departure_span, departures)
+        tof_days = np.linspace(tof_range[0], tof_range[1], tofs)
+        c3 = np.empty((departures, tofs))
+        vinf_arrival = np.empty((departures, tofs))
+        
+        # Chunk over departure rows to bound peak memory
+        for row in range(0, departures, chunk_size):
+            dep = epoch + departure_days[row:row + chunk_size, None]
+            arr = dep + tof_days[None, :]
+            r1, v_earth = self.planet_state(self.earth, np.broadcast_to(dep, arr.shape), use_ephemeris)
+            r2, v_target = self.planet_state(self.planets[target], arr, use_ephemeris)
+            v1, v2 = self.solve_lambert(r1, r2, (arr - dep) * 86400)
+            c3[row:row + chunk_size] = np.sum((v1 - v_earth)**2, axis=-1)
+            vinf_arrival[row:row + chunk_size] = np.linalg.norm(v2 - v_target, axis=-1)
+        
+        if cache_file:
+            # Write then rename, so other workers never load a half-written grid
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_file = f'{cache_file}.{os.getpid()}.tmp'
+            with open(tmp_file, 'wb') as f:
+                np.savez_compressed(f, departure_days=departure_days, tof_days=tof_days,
+                                    c3=c3, vinf_arrival=vinf_arrival)
+            os.replace(tmp_file, cache_file)
+            self._evict_cache()
+        
+        return self._porkchop_result(target, start_date, departure_days, tof_days, c3, vinf_arrival)
+    
+    def _evict_cache(self):
+        """Delete the least recently used grids beyond cache_max_files"""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.npz'):
+                try:
+                    entries.append((entry.stat().st_mtime, entry.path))
+                except OSError:
+                    pass  # removed by another worker
+        entries.sort()
+        for _, path in entries[:max(len(entries) - self.cache_max_files, 0)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    
+    def _porkchop_result(self, target, start_date, departure_days, tof_days, c3, vinf_arrival):
+        """Package porkchop grids with the minimum total v-infinity cell"""
+        total = np.sqrt(c3) + vinf_arrival
+        optimum = None
+        if np.isfinite(total).any():
+            i, j = np.unravel_index(np.nanargmin(total), total.shape)
+            launch_date = start_date + timedelta(days=float(departure_days[i]))
+            optimum = {
+                'launch_date': launch_date.strftime('%Y-%m-%d'),
+                'arrival_date': (launch_date + timedelta(days=float(tof_days[j]))).strftime('%Y-%m-%d'),
+                'transfer_days': float(tof_days[j]),
+                'c3': float(c3[i, j]),
+                'vinf_arrival': float(vinf_arrival[i, j])
+            }
+        
+        def to_json(grid):
+            return np.where(np.isfinite(grid), np.round(grid, 4), None).tolist()
         
         return {
-            'efficiency': efficiency * 100,
-            'fuel_penalty': fuel_penalty * 100,
-            'recommended': efficiency > 0.8
-        }
\ No newline at end of file
+            'target': target,
+            'departure_dates': [(start_date + timedelta(days=float(d))).strftime('%Y-%m-%d') for d in departure_days],
+            'tof_days': tof_days.tolist(),
+            'c3': to_json(c3),  # km²/s²
+            'vinf_arrival': to_json(vinf_arrival),  # km/s
+            'optimum': optimum
+        }
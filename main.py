@@ -1,112 +1,315 @@
-import matplotlib.pyplot as plt
-import numpy as np
-from matplotlib.animation import FuncAnimation
-import os
-import matplotlib
 import argparse
+import hashlib
+import itertools
 import json
+import os
+import subprocess
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import matplotlib
 matplotlib.use('Agg')  # Use non-interactive backend for Docker
-
-# Parse arguments
-parser = argparse.ArgumentParser(description='Rocket Simulation')
-parser.add_argument('--target', choices=['venus', 'mars', 'jupiter'], default='mars')
-parser.add_argument('--speed', type=int, default=50, help='Animation speed (ms)')
-parser.add_argument('--steps', type=int, default=200, help='Animation steps')
-parser.add_argument('--format', choices=['mp4'], default='mp4')
-args = parser.parse_args()
+import matplotlib.pyplot as plt
+from matplotlib.animation import FuncAnimation
+from trajectory_export import BODIES, CHUNK_STEPS, EXPORT_FORMATS, write_export
+from orbital_mechanics import DAYS_PER_YEAR, EARTH_DISTANCE, PLANET_CONSTANTS, sample_times, transfer_positions
 
 # Planet data
-planets = {'venus': 0.723, 'mars': 1.524, 'jupiter': 5.204}
-a_earth = 1.0
-a_target = planets[args.target]
-omega_earth, omega_target = 2*np.pi, 2*np.pi/a_target**1.5
-a_transfer = (a_earth + a_target) / 2
-e = abs(a_target - a_earth) / (a_earth + a_target)
-t_transfer = a_transfer**1.5 / 2
-
-# Calculate positions
-num_steps = args.steps
-t = np.linspace(0, t_transfer, num_steps)
-theta_target0 = np.pi - omega_target * t_transfer
-
-theta_earth = omega_earth * t
-x_earth, y_earth = a_earth * np.cos(theta_earth), a_earth * np.sin(theta_earth)
-
-theta_target = theta_target0 + omega_target * t
-x_target, y_target = a_target * np.cos(theta_target), a_target * np.sin(theta_target)
-
-theta_rocket = np.pi * t / t_transfer
-r_rocket = a_transfer * (1 - e**2) / (1 + e * np.cos(theta_rocket))
-x_rocket, y_rocket = r_rocket * np.cos(theta_rocket), r_rocket * np.sin(theta_rocket)
-
-# Setup plot
-fig, ax = plt.subplots(figsize=(10, 8), subplot_kw={'projection': '3d'})
-
-# Plot orbits and trajectory
-theta = np.linspace(0, 2*np.pi, 100)
-ax.plot(a_earth*np.cos(theta), a_earth*np.sin(theta), 0, 'b--', label='Earth Orbit')
-colors = {'venus': 'orange', 'mars': 'r', 'jupiter': 'brown'}
-color = colors[args.target]
-ax.plot(a_target*np.cos(theta), a_target*np.sin(theta), 0, f'{color}--', label=f'{args.target.title()} Orbit')
-ax.plot(x_rocket, y_rocket, 0, 'g-', label='Rocket Trajectory')
-ax.scatter(0, 0, 0, color='yellow', s=100, label='Sun')
-
-earth_dot, = ax.plot([], [], [], 'bo', markersize=8)
-target_dot, = ax.plot([], [], [], f'{color}o', markersize=8)
-rocket_dot, = ax.plot([], [], [], 'go', markersize=6)
-
-def animate(i):
-    earth_dot.set_data([x_earth[i]], [y_earth[i]])
-    earth_dot.set_3d_properties([0])
-    target_dot.set_data([x_target[i]], [y_target[i]])
-    target_dot.set_3d_properties([0])
-    rocket_dot.set_data([x_rocket[i]], [y_rocket[i]])
-    rocket_dot.set_3d_properties([0])
-    
+PLANETS = {name: planet['distance'] for name, planet in PLANET_CONSTANTS.items()}
+COLORS = {'venus': 'orange', 'mars': 'r', 'jupiter': 'brown'}
+FIGSIZE = (10, 8)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Rocket Simulation')
+    parser.add_argument('--target', choices=['venus', 'mars', 'jupiter'], default='mars')
+    parser.add_argument('--speed', type=int, default=50, help='Animation speed (ms)')
+    parser.add_argument('--steps', type=int, default=200, help='Animation steps')
+    parser.add_argument('--format', choices=['mp4'], default='mp4')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Frame rendering processes')
+    parser.add_argument('--chunk-size', type=int, default=25, help='Frames per rendering task')
+    parser.add_argument('--legacy-render', action='store_true', help='Render with FuncAnimation on one core')
+    parser.add_argument('--export-format', choices=['json', *EXPORT_FORMATS], default='json',
+                        help='Trajectory data format; ndjson, csv and npy are written in chunks')
+    parser.add_argument('--export-only', action='store_true', help='Skip the animation and only export data')
+    parser.add_argument('--sweep', metavar='SPEC', help='Run a parameter sweep from a JSON job spec')
+    parser.add_argument('--output-dir', default='results/sweep', help='Sweep output directory')
+    return parser.parse_args(argv)
+
+def compute_positions(target, num_steps, start=0, stop=None):
+    """Earth, target and rocket positions along the Hohmann transfer, for steps [start, stop)"""
+    a_target = PLANETS[target]
+    t_transfer = PLANET_CONSTANTS[target]['transfer_time']
+    t = sample_times(t_transfer, num_steps, start, num_steps if stop is None else min(stop, num_steps))
+    earth, target_position, rocket = transfer_positions(a_target, t)
+    return {
+        'a_earth': EARTH_DISTANCE, 'a_target': a_target, 't_transfer': t_transfer,
+        'earth': earth, 'target': target_position, 'rocket': rocket
+    }
+
+def build_figure(target, positions):
+    """Set up the 3D plot with orbits, trajectory, Sun and legend"""
+    a_earth, a_target = positions['a_earth'], positions['a_target']
+    x_rocket, y_rocket = positions['rocket']
+    fig, ax = plt.subplots(figsize=FIGSIZE, subplot_kw={'projection': '3d'})
+
+    # Plot orbits and trajectory
+    theta = np.linspace(0, 2*np.pi, 100)
+    ax.plot(a_earth*np.cos(theta), a_earth*np.sin(theta), 0, 'b--', label='Earth Orbit')
+    color = COLORS[target]
+    ax.plot(a_target*np.cos(theta), a_target*np.sin(theta), 0, '--', color=color, label=f'{target.title()} Orbit')
+    ax.plot(x_rocket, y_rocket, 0, 'g-', label='Rocket Trajectory')
+    ax.scatter(0, 0, 0, color='yellow', s=100, label='Sun')
+
+    earth_dot, = ax.plot([], [], [], 'bo', markersize=8)
+    target_dot, = ax.plot([], [], [], 'o', color=color, markersize=8)
+    rocket_dot, = ax.plot([], [], [], 'go', markersize=6)
+
+    ax.set_xlabel('X (AU)')
+    ax.set_ylabel('Y (AU)')
+    ax.set_title(f'Rocket Journey from Earth to {target.title()}')
+    max_dist = max(a_earth, a_target) * 1.2
+    ax.set_xlim(-max_dist, max_dist)
+    ax.set_ylim(-max_dist, max_dist)
+    ax.set_zlim(-0.1, 0.1)
+    ax.legend()
+    return fig, ax, (earth_dot, target_dot, rocket_dot)
+
+def update_frame(ax, dots, positions, i, num_steps):
+    """Move the markers to step i and update the progress title"""
+    for dot, body in zip(dots, ('earth', 'target', 'rocket')):
+        x, y = positions[body]
+        dot.set_data([x[i]], [y[i]])
+        dot.set_3d_properties([0])
+
     # Update title with progress
     progress = (i / num_steps) * 100
     ax.set_title(f'Rocket Journey - Progress: {progress:.1f}%')
-    return earth_dot, target_dot, rocket_dot
-
-# Create animation
-anim = FuncAnimation(fig, animate, frames=num_steps, interval=args.speed, blit=False)
-
-ax.set_xlabel('X (AU)')
-ax.set_ylabel('Y (AU)')
-ax.set_title(f'Rocket Journey from Earth to {args.target.title()}')
-max_dist = max(a_earth, a_target) * 1.2
-ax.set_xlim(-max_dist, max_dist)
-ax.set_ylim(-max_dist, max_dist)
-ax.set_zlim(-0.1, 0.1)
-ax.legend()
-
-# Calculate metrics
-distance = np.sqrt(x_rocket**2 + y_rocket**2)
-print(f"Mission Metrics:")
-print(f"Transfer time: {t_transfer * 365.25:.0f} days")
-print(f"Max distance: {np.max(distance):.2f} AU")
-
-try:
-    os.makedirs('results', exist_ok=True)
-    filename = f'results/animation.{args.format}'
-    writer = 'ffmpeg'
-    anim.save(filename, writer=writer)
-    
-    # Export data
+    return dots
+
+def render_legacy(target, positions, num_steps, speed, filename):
+    """Render with FuncAnimation, redrawing the full figure every frame"""
+    fig, ax, dots = build_figure(target, positions)
+    anim = FuncAnimation(fig, lambda i: update_frame(ax, dots, positions, i, num_steps),
+                         frames=num_steps, interval=speed, blit=False)
+    anim.save(filename, writer='ffmpeg')
+    plt.close(fig)
+
+_renderer = {}
+
+def _init_renderer(target, positions, num_steps):
+    """Draw the static background once per process; frames only composite the markers and title"""
+    fig, ax, dots = build_figure(target, positions)
+    update_frame(ax, dots, positions, 0, num_steps)
+    fig.canvas.draw()
+    title_position = ax.title.get_position()  # where full-figure redraws lay out the title
+
+    for artist in (*dots, ax.title):
+        artist.set_visible(False)
+    fig.canvas.draw()
+    background = fig.canvas.copy_from_bbox(fig.bbox)
+    for artist in (*dots, ax.title):
+        artist.set_visible(True)
+    _renderer.update(fig=fig, ax=ax, dots=dots, background=background, title_position=title_position,
+                     positions=positions, num_steps=num_steps)
+
+def _render_frames(start, stop):
+    """Rasterize frames [start, stop) to concatenated raw RGB bytes"""
+    fig, ax, dots = _renderer['fig'], _renderer['ax'], _renderer['dots']
+    canvas = fig.canvas
+    frames = []
+    for i in range(start, stop):
+        canvas.restore_region(_renderer['background'])
+        update_frame(ax, dots, _renderer['positions'], i, _renderer['num_steps'])
+        ax.title.set_position(_renderer['title_position'])  # Axes3D.set_title rescales y until the next full draw
+        for dot in dots:
+            ax.draw_artist(dot)
+        ax.draw_artist(ax.title)
+        frames.append(np.asarray(canvas.buffer_rgba())[..., :3].tobytes())
+    return b''.join(frames)
+
+def render_parallel(target, positions, num_steps, speed, filename, workers=1, chunk_size=25):
+    """Render frame chunks across a process pool and stream them into one ffmpeg pipe"""
+    width, height = (int(round(v * matplotlib.rcParams['figure.dpi'])) for v in FIGSIZE)
+    command = ['ffmpeg', '-f', 'rawvideo', '-vcodec', 'rawvideo', '-s', f'{width}x{height}',
+               '-pix_fmt', 'rgb24', '-framerate', str(1000 / speed), '-loglevel', 'error',
+               '-i', 'pipe:', '-vcodec', 'h264', '-pix_fmt', 'yuv420p', '-y', filename]
+    chunks = [(start, min(start + chunk_size, num_steps)) for start in range(0, num_steps, chunk_size)]
+
+    with subprocess.Popen(command, stdin=subprocess.PIPE) as ffmpeg:
+        if workers <= 1:
+            _init_renderer(target, positions, num_steps)
+            for chunk in chunks:
+                ffmpeg.stdin.write(_render_frames(*chunk))
+            plt.close(_renderer['fig'])
+        else:
+            with ProcessPoolExecutor(workers, initializer=_init_renderer,
+                                     initargs=(target, positions, num_steps)) as pool:
+                # Bounded in-flight window keeps memory flat while writing frames in order
+                pending = deque()
+                for chunk in chunks:
+                    pending.append(pool.submit(_render_frames, *chunk))
+                    if len(pending) >= workers * 2:
+                        ffmpeg.stdin.write(pending.popleft().result())
+                while pending:
+                    ffmpeg.stdin.write(pending.popleft().result())
+        ffmpeg.stdin.close()
+        if ffmpeg.wait():
+            raise RuntimeError(f'ffmpeg exited with status {ffmpeg.returncode}')
+
+def position_chunks(target, num_steps, chunk_steps=CHUNK_STEPS):
+    """Yield (start, (n, 3, 2) array) position chunks without materializing the whole trajectory"""
+    for start in range(0, num_steps, chunk_steps):
+        positions = compute_positions(target, num_steps, start, start + chunk_steps)
+        yield start, np.stack([np.column_stack(positions[body]) for body in BODIES], axis=1)
+
+def export_data(target, positions, filename):
+    """Write positions as JSON"""
     data = {
-        'mission': f'Earth to {args.target}',
+        'mission': f'Earth to {target}',
         'positions': {
-            'earth': [[float(x), float(y)] for x, y in zip(x_earth, y_earth)],
-            'target': [[float(x), float(y)] for x, y in zip(x_target, y_target)],
-            'rocket': [[float(x), float(y)] for x, y in zip(x_rocket, y_rocket)]
+            body: [[float(x), float(y)] for x, y in zip(*positions[body])]
+            for body in ('earth', 'target', 'rocket')
         }
     }
-    with open('results/mission_data.json', 'w') as f:
+    with open(filename, 'w') as f:
         json.dump(data, f, indent=2)
-    
-    print(f"Animation saved to {filename}")
-    print("Data exported to results/mission_data.json")
-except Exception as e:
-    print(f"Error: {e}")
 
-# plt.show()  # Disabled for Docker     
\ No newline at end of file
+def load_sweep(path, defaults):
+    """Expand a JSON spec of targets x steps x speeds into a list of jobs"""
+    with open(path) as f:
+        spec = json.load(f)
+    grid = {
+        'target': spec.get('targets', [defaults.target]),
+        'steps': spec.get('steps', [defaults.steps]),
+        'speed': spec.get('speeds', [defaults.speed])
+    }
+    for target in grid['target']:
+        if target not in PLANETS:
+            raise ValueError(f'Unknown target in sweep spec: {target}')
+    return [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+
+def job_name(job):
+    return f"{job['target']}_{job['steps']}steps_{job['speed']}ms"
+
+def file_digest(path):
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def is_complete(entry, job, output_dir):
+    """True when a manifest entry matches the job and every output still hashes the same"""
+    if not entry or entry.get('status') != 'done' or entry.get('params') != job:
+        return False
+    for name, digest in entry['outputs'].items():
+        path = os.path.join(output_dir, name)
+        if not os.path.exists(path) or file_digest(path) != digest:
+            return False
+    return True
+
+def run_job(job, output_dir, fmt='mp4'):
+    """Render one sweep job into its own directory and hash the outputs"""
+    started = time.time()
+    name = job_name(job)
+    os.makedirs(os.path.join(output_dir, name), exist_ok=True)
+    positions = compute_positions(job['target'], job['steps'])
+    outputs = {
+        'animation': os.path.join(name, f'animation.{fmt}'),
+        'data': os.path.join(name, 'mission_data.json')
+    }
+    render_parallel(job['target'], positions, job['steps'], job['speed'],
+                    os.path.join(output_dir, outputs['animation']))
+    export_data(job['target'], positions, os.path.join(output_dir, outputs['data']))
+    return {
+        'params': job,
+        'status': 'done',
+        'outputs': {path: file_digest(os.path.join(output_dir, path)) for path in outputs.values()},
+        'elapsed': time.time() - started
+    }
+
+def write_manifest(path, manifest):
+    # Write-then-rename so an interrupted sweep never leaves a truncated manifest
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+def run_sweep(spec_path, args):
+    """Run every job in the spec across a process pool, skipping jobs already in the manifest"""
+    jobs = load_sweep(spec_path, args)
+    output_dir = args.output_dir
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, 'manifest.json')
+    manifest = {'jobs': {}}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    pending = [job for job in jobs if not is_complete(manifest['jobs'].get(job_name(job)), job, output_dir)]
+    print(f"Sweep: {len(jobs)} jobs, {len(jobs) - len(pending)} up to date, {len(pending)} to run")
+
+    # One job per worker process; each renders its frames serially so cores are not oversubscribed
+    with ProcessPoolExecutor(max(1, min(args.workers, len(pending) or 1))) as pool:
+        futures = {pool.submit(run_job, job, output_dir, args.format): job for job in pending}
+        for future in as_completed(futures):
+            job = futures[future]
+            name = job_name(job)
+            try:
+                manifest['jobs'][name] = future.result()
+                print(f"  {name}: done in {manifest['jobs'][name]['elapsed']:.1f}s")
+            except Exception as e:
+                manifest['jobs'][name] = {'params': job, 'status': 'failed', 'error': str(e)}
+                print(f"  {name}: failed ({e})")
+            write_manifest(manifest_path, manifest)
+
+    manifest['spec'] = os.path.abspath(spec_path)
+    manifest['updated'] = time.time()
+    write_manifest(manifest_path, manifest)
+    print(f"Manifest written to {manifest_path}")
+    return manifest
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.sweep:
+        try:
+            run_sweep(args.sweep, args)
+        except Exception as e:
+            print(f"Error: {e}")
+        return
+
+    # Metrics come from a chunked pass so long runs never hold the whole trajectory
+    t_transfer = PLANET_CONSTANTS[args.target]['transfer_time']
+    max_distance = max(float(np.max(np.sqrt(np.sum(chunk[:, 2]**2, axis=1))))
+                       for _, chunk in position_chunks(args.target, args.steps))
+    print(f"Mission Metrics:")
+    print(f"Transfer time: {t_transfer * DAYS_PER_YEAR:.0f} days")
+    print(f"Max distance: {max_distance:.2f} AU")
+
+    try:
+        os.makedirs('results', exist_ok=True)
+        positions = None
+        if not args.export_only:
+            positions = compute_positions(args.target, args.steps)
+            filename = f'results/animation.{args.format}'
+            if args.legacy_render:
+                render_legacy(args.target, positions, args.steps, args.speed, filename)
+            else:
+                render_parallel(args.target, positions, args.steps, args.speed, filename,
+                                args.workers, args.chunk_size)
+            print(f"Animation saved to {filename}")
+
+        # Export data
+        data_file = f'results/mission_data.{args.export_format}'
+        if args.export_format == 'json':
+            export_data(args.target, positions or compute_positions(args.target, args.steps), data_file)
+        else:
+            write_export(data_file, position_chunks(args.target, args.steps), args.export_format, args.steps)
+        print(f"Data exported to {data_file}")
+    except Exception as e:
+        print(f"Error: {e}")
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,51 @@
+import csv
+import heapq
+import io
+import json
+import math
+import os
+import re
+import threading
+import time
+import numpy as np
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
 from datetime import datetime
 
+CATALOG_FORMATS = ('csv', 'ndjson', 'json')
+LIST_SEPARATOR = ';'  # route and achievements inside one CSV cell
+LAST_ID = chr(0x10FFFF)  # sorts after every mission id, closing launch-date ranges
+SCORE_TABLES_PER_TARGET = 64  # cached comparisons per target (one per simulated duration and limit)
+
 class MissionDatabase:
-    def __init__(self):
-        self.missions = {
-            'voyager_1': {
+    """Mission catalog with secondary indexes and incrementally maintained stats
+
+    Indexes map target, status and every body on a mission's route to the
+    mission ids (insertion-ordered dicts used as sets), and keep (launch_date, id)
+    pairs sorted per status, so lookups and filtered queries cost O(matches)
+    rather than a scan. Catalog files imported into catalog_dir are picked up
+    by every worker process on its next refresh.
+    """
+
+    def __init__(self, catalog_dir=None, refresh_interval=1.0):
+        self.missions = {}
+        self.by_target = defaultdict(dict)
+        self.by_status = defaultdict(dict)
+        self.by_body = defaultdict(dict)
+        self.launches = defaultdict(list)  # status -> sorted [(launch_date, mission_id)]
+        self.version = 0  # bumped on every change
+        self._columns = {}  # target -> (names, durations, durations as float64), rebuilt after the target changes
+        self._scores = defaultdict(dict)  # target -> {(simulated duration, limit): comparisons}
+        self._lock = threading.RLock()
+
+        self.catalog_dir = catalog_dir
+        self.refresh_interval = refresh_interval
+        self._loaded_files = set()
+        self._last_refresh = 0
+
+        self.import_missions([
+            {
+                'id': 'voyager_1',
                 'name': 'Voyager 1',
                 'launch_date': '1977-09-05',
                 'target': 'jupiter',
@@ -13,7 +55,8 @@ class MissionDatabase:
                 'duration_days': 16800,
                 'distance_au': 159.0
             },
-            'voyager_2': {
+            {
+                'id': 'voyager_2',
                 'name': 'Voyager 2',
                 'launch_date': '1977-08-20',
                 'target': 'jupiter',
@@ -23,7 +66,8 @@ class MissionDatabase:
                 'duration_days': 16900,
                 'distance_au': 132.0
             },
-            'cassini': {
+            {
+                'id': 'cassini',
                 'name': 'Cassini-Huygens',
                 'launch_date': '1997-10-15',
                 'target': 'saturn',
@@ -33,7 +77,8 @@ class MissionDatabase:
                 'duration_days': 7300,
                 'distance_au': 9.5
             },
-            'new_horizons': {
+            {
+                'id': 'new_horizons',
                 'name': 'New Horizons',
                 'launch_date': '2006-01-19',
                 'target': 'pluto',
@@ -43,7 +88,8 @@ class MissionDatabase:
                 'duration_days': 6500,
                 'distance_au': 50.0
             },
-            'mars_2020': {
+            {
+                'id': 'mars_2020',
                 'name': 'Perseverance',
                 'launch_date': '2020-07-30',
                 'target': 'mars',
@@ -53,53 +99,314 @@ class MissionDatabase:
                 'duration_days': 1200,
                 'distance_au': 1.5
             }
-        }
-    
+        ])
+        self.refresh(force=True)
+
+    def _index(self, mission_id, mission):
+        self._invalidate(mission['target'])
+        self.missions[mission_id] = mission
+        self.by_target[mission['target']][mission_id] = None
+        self.by_status[mission['status']][mission_id] = None
+        for body in dict.fromkeys(mission['route']):
+            self.by_body[body][mission_id] = None
+        insort(self.launches[mission['status']], (mission['launch_date'], mission_id))
+
+    def _unindex(self, mission_id):
+        mission = self.missions.pop(mission_id)
+        self._invalidate(mission['target'])
+        for index, key in ([(self.by_target, mission['target']), (self.by_status, mission['status'])]
+                           + [(self.by_body, body) for body in dict.fromkeys(mission['route'])]):
+            del index[key][mission_id]
+            if not index[key]:
+                del index[key]
+        launches = self.launches[mission['status']]
+        del launches[bisect_left(launches, (mission['launch_date'], mission_id))]
+        return mission
+
+    def _invalidate(self, target):
+        self._columns.pop(target, None)
+        self._scores.pop(target, None)
+
+    def _target_columns(self, target):
+        """Names and durations of the target's missions that have one, plus a float64 duration column"""
+        columns = self._columns.get(target)
+        if columns is None:
+            missions = [self.missions[mission_id] for mission_id in self.by_target.get(target, ())]
+            missions = [mission for mission in missions if mission['duration_days']]
+            durations = [mission['duration_days'] for mission in missions]
+            columns = self._columns[target] = (
+                [mission['name'] for mission in missions], durations, np.array(durations, dtype=np.float64)
+            )
+        return columns
+
+    def add_mission(self, mission):
+        """Insert or replace one mission (a dict with an id or name); returns its id"""
+        return self.import_missions([mission])[0]
+
+    def remove_mission(self, mission_id):
+        with self._lock:
+            if mission_id not in self.missions:
+                return None
+            self.version += 1
+            return self._unindex(mission_id)
+
+    def import_missions(self, rows, max_rows=None):
+        """Validate every row, then apply them together; returns the imported ids
+
+        Rows are normalized one at a time, so any iterable (a file reader, a
+        request stream) works. A bad row, unreadable input or more than max_rows
+        rows raises ValueError and imports nothing.
+        """
+        return self._apply(self._validate(rows, max_rows))
+
+    def _validate(self, rows, max_rows=None):
+        records = []
+        try:
+            # Reader errors surface on the for line, so they share the row's try
+            for row in rows:
+                if max_rows and len(records) >= max_rows:
+                    raise ValueError(f'catalog has more than {max_rows} rows')
+                records.append(normalize_mission(row))
+        except (AttributeError, KeyError, TypeError, ValueError, csv.Error) as e:
+            raise ValueError(f'Row {len(records) + 1}: {e}') from None
+        return records
+
+    def _apply(self, records):
+        with self._lock:
+            for mission_id, mission in records:
+                if mission_id in self.missions:
+                    self._unindex(mission_id)
+                self._index(mission_id, mission)
+            self.version += 1
+        return [mission_id for mission_id, _ in records]
+
+    def import_stream(self, stream, fmt):
+        """Import a binary catalog stream in csv, ndjson or json"""
+        return self.import_missions(read_catalog(stream, fmt))
+
+    def import_file(self, path, fmt=None):
+        """Import a catalog file; the format defaults to its extension"""
+        fmt = fmt or catalog_format(path)
+        with open(path, 'rb') as f:
+            return self.import_stream(f, fmt)
+
+    def save_catalog(self, stream, fmt, max_bytes=None, max_rows=None):
+        """Import an uploaded catalog and keep it in catalog_dir so other workers load it too
+
+        The upload is read into memory (at most max_bytes) and every row is
+        validated (at most max_rows) before anything is written or indexed.
+        """
+        if fmt not in CATALOG_FORMATS:
+            raise ValueError(f'Unsupported catalog format: {fmt}')
+        body = io.BytesIO()
+        while True:
+            block = stream.read(1 << 16)
+            if not block:
+                break
+            body.write(block)
+            if max_bytes and body.tell() > max_bytes:
+                raise ValueError(f'Catalog larger than {max_bytes} bytes')
+        data = body.getvalue()
+        records = self._validate(read_catalog(io.BytesIO(data), fmt), max_rows)
+        if not self.catalog_dir:
+            return self._apply(records)
+
+        os.makedirs(self.catalog_dir, exist_ok=True)
+        name = f'{time.time_ns()}-{os.getpid()}.{fmt}'
+        tmp_path = os.path.join(self.catalog_dir, f'.{name}.tmp')
+        with self._lock:
+            try:
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, os.path.join(self.catalog_dir, name))
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            self._loaded_files.add(name)
+            return self._apply(records)
+
+    def refresh(self, force=False):
+        """Load catalog files added to catalog_dir since the last refresh, oldest first"""
+        if not self.catalog_dir or (not force and time.time() - self._last_refresh < self.refresh_interval):
+            return 0
+        self._last_refresh = time.time()
+        if not os.path.isdir(self.catalog_dir):
+            return 0
+        loaded = 0
+        with self._lock:
+            for name in sorted(os.listdir(self.catalog_dir)):
+                if name in self._loaded_files or name.startswith('.') or not name.endswith(CATALOG_FORMATS):
+                    continue
+                try:
+                    loaded += len(self.import_file(os.path.join(self.catalog_dir, name)))
+                except (OSError, ValueError) as e:
+                    print(f"Warning: skipping mission catalog {name}: {e}")
+                self._loaded_files.add(name)
+        return loaded
+
+    def get_mission(self, mission_id):
+        self.refresh()
+        mission = self.missions.get(mission_id)
+        return {'id': mission_id, **mission} if mission else None
+
     def get_missions_by_target(self, target):
         """Get all missions to a specific target"""
-        return [mission for mission in self.missions.values() 
-                if mission['target'] == target]
-    
+        return [self.missions[mission_id] for mission_id in self.by_target.get(target, ())]
+
     def get_active_missions(self):
         """Get currently active missions"""
-        return [mission for mission in self.missions.values() 
-                if mission['status'] == 'active']
-    
+        return [self.missions[mission_id] for mission_id in self.by_status.get('active', ())]
+
+    def query(self, target=None, status=None, body=None, launched_after=None, launched_before=None,
+              offset=0, limit=100):
+        """Missions matching every given filter, in launch-date order, one page at a time
+
+        Launch dates are inclusive YYYY-MM-DD bounds. Returns the page plus the
+        total match count.
+        """
+        self.refresh()
+        low = (launched_after or '',)
+        high = (launched_before or '9999-12-31', LAST_ID)
+        with self._lock:
+            filters = [index.get(key, {}) for index, key in
+                       ((self.by_target, target), (self.by_status, status), (self.by_body, body)) if key]
+            if filters:
+                # Walk the smallest index, probing the others
+                filters.sort(key=len)
+                matches = sorted((self.missions[mission_id]['launch_date'], mission_id) for mission_id in filters[0]
+                                 if all(mission_id in other for other in filters[1:]))
+                matches = matches[bisect_left(matches, low):bisect_right(matches, high)]
+            else:
+                matches = list(heapq.merge(*(launches[bisect_left(launches, low):bisect_right(launches, high)]
+                                             for launches in self.launches.values())))
+            page = [{'id': mission_id, **self.missions[mission_id]} for _, mission_id in matches[offset:offset + limit]]
+        return {'total': len(matches), 'offset': offset, 'limit': limit, 'missions': page}
+
     def get_mission_stats(self):
         """Get database statistics"""
-        total = len(self.missions)
-        active = len(self.get_active_missions())
-        completed = total - active
-        
-        targets = {}
-        for mission in self.missions.values():
-            target = mission['target']
-            targets[target] = targets.get(target, 0) + 1
-        
+        self.refresh()
+        with self._lock:
+            active = self.launches.get('active')
+            return {
+                'total_missions': len(self.missions),
+                'active_missions': len(self.by_status.get('active', ())),
+                'completed_missions': len(self.by_status.get('completed', ())),
+                'statuses': {status: len(ids) for status, ids in self.by_status.items()},
+                'targets': {target: len(ids) for target, ids in self.by_target.items()},
+                'oldest_active': self.missions[active[0][1]]['name'] if active else None
+            }
+
+    def compare_with_simulation(self, target, sim_transfer_time, limit=None):
+        """Compare simulation with historical missions
+
+        Scores every mission to the target in one pass over its duration column.
+        With a limit, only the nearest missions are returned, closest first.
+        Results are kept per (duration, limit) until the target's missions
+        change, so repeated simulations of the same transfer cost a dict lookup.
+        """
+        self.refresh()
+        key = (sim_transfer_time, limit)
+        comparisons = self._scores.get(target, {}).get(key)
+        if comparisons is not None:
+            return comparisons
+        with self._lock:
+            names, actual, durations = self._target_columns(target)
+            if not names:
+                return None
+            difference = np.abs(durations - sim_transfer_time)
+            order = np.arange(len(names))
+            if limit is not None and limit < len(names):
+                order = np.sort(np.argpartition(difference, limit - 1)[:limit])
+            if limit is not None:
+                order = order[np.argsort(difference[order], kind='stable')]
+            accuracy = np.maximum(0, 100 - difference[order] / durations[order] * 100)
+            comparisons = [{
+                'mission_name': names[i],
+                'actual_duration': actual[i],
+                'simulated_duration': sim_transfer_time,
+                'difference': diff,
+                'accuracy': acc
+            } for i, diff, acc in zip(order.tolist(), difference[order].tolist(), accuracy.tolist())]
+            scores = self._scores[target]
+            if len(scores) >= SCORE_TABLES_PER_TARGET:
+                scores.clear()
+            scores[key] = comparisons
+        return comparisons
+
+    def stats(self):
+        """Get catalog statistics"""
         return {
-            'total_missions': total,
-            'active_missions': active,
-            'completed_missions': completed,
-            'targets': targets,
-            'oldest_active': min([m for m in self.missions.values() if m['status'] == 'active'], 
-                               key=lambda x: x['launch_date'])['name']
+            'missions': len(self.missions),
+            'version': self.version,
+            'catalog_files': len(self._loaded_files),
+            'catalog_dir': self.catalog_dir
         }
-    
-    def compare_with_simulation(self, target, sim_transfer_time):
-        """Compare simulation with historical missions"""
-        historical = self.get_missions_by_target(target)
-        if not historical:
-            return None
-        
-        comparisons = []
-        for mission in historical:
-            comparison = {
-                'mission_name': mission['name'],
-                'actual_duration': mission['duration_days'],
-                'simulated_duration': sim_transfer_time,
-                'difference': abs(mission['duration_days'] - sim_transfer_time),
-                'accuracy': max(0, 100 - abs(mission['duration_days'] - sim_transfer_time) / mission['duration_days'] * 100)
-            }
-            comparisons.append(comparison)
-        
-        return comparisons
\ No newline at end of file
+
+def catalog_format(path):
+    extension = os.path.splitext(path)[1].lstrip('.').lower()
+    fmt = {'jsonl': 'ndjson'}.get(extension, extension)
+    if fmt not in CATALOG_FORMATS:
+        raise ValueError(f'Unsupported catalog format: {extension}')
+    return fmt
+
+def read_catalog(stream, fmt):
+    """Yield mission rows from a binary stream; csv and ndjson are read row by row
+
+    json accepts a list of missions or an {id: mission} object and is parsed whole.
+    """
+    if fmt == 'csv':
+        yield from csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+    elif fmt == 'ndjson':
+        for line in io.TextIOWrapper(stream, encoding='utf-8'):
+            if line.strip():
+                yield json.loads(line)
+    elif fmt == 'json':
+        data = json.load(stream)
+        if isinstance(data, dict):
+            data = [{'id': mission_id, **mission} for mission_id, mission in data.items()]
+        yield from data
+    else:
+        raise ValueError(f'Unsupported catalog format: {fmt}')
+
+def _list(value):
+    if value is None or value == '':
+        return []
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(LIST_SEPARATOR) if item.strip()]
+    return [str(item) for item in value]
+
+def _number(value):
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+def _positive(row, key):
+    value = _number(row.get(key))
+    if value is not None and not (math.isfinite(value) and value > 0):
+        raise ValueError(f'{key} must be a positive finite number')
+    return value
+
+def normalize_mission(row):
+    """(mission_id, mission) from a raw catalog row, or ValueError"""
+    name = str(row['name']).strip()
+    mission_id = str(row.get('id') or row.get('mission_id') or re.sub(r'\W+', '_', name.lower()).strip('_'))
+    if not name or not mission_id:
+        raise ValueError('missing name')
+    launch_date = str(row['launch_date']).strip()
+    datetime.strptime(launch_date, '%Y-%m-%d')
+    target = str(row['target']).strip().lower()
+    return mission_id, {
+        'name': name,
+        'launch_date': launch_date,
+        'target': target,
+        'route': [body.lower() for body in _list(row.get('route'))] or ['earth', target],
+        'status': str(row.get('status') or 'planned').strip().lower(),
+        'achievements': _list(row.get('achievements')),
+        'duration_days': _positive(row, 'duration_days'),
+        'distance_au': _positive(row, 'distance_au')
+    }
@@ -0,0 +1,152 @@
+import json
+import queue
+import threading
+import time
+
+class Subscription:
+    __slots__ = ('mission_id', 'queue', 'synced')
+
+    def __init__(self, mission_id, queue_size):
+        self.mission_id = mission_id  # None watches every active mission
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.synced = False
+
+class MissionBroadcaster:
+    def __init__(self, tracker, interval=1.0, max_subscribers=200, queue_size=8):
+        self.tracker = tracker
+        self.interval = interval
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self.subscribers = set()
+        self.dropped_messages = 0
+        self._last = {}  # last pushed state per mission
+        self._lock = threading.Lock()
+        self._thread = None
+        self.closed = False
+
+    def subscribe(self, mission_id=None):
+        """Register a subscriber, or return None when the subscriber cap is reached"""
+        with self._lock:
+            if self.closed or len(self.subscribers) >= self.max_subscribers:
+                return None
+            subscription = Subscription(mission_id, self.queue_size)
+            self.subscribers.add(subscription)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='mission-ticker', daemon=True)
+                self._thread.start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Remove a subscriber"""
+        with self._lock:
+            self.subscribers.discard(subscription)
+
+    def close(self):
+        """End every open stream (clients reconnect elsewhere via the SSE retry hint)"""
+        with self._lock:
+            self.closed = True
+            subscribers = list(self.subscribers)
+        for subscription in subscribers:
+            while True:
+                try:
+                    subscription.queue.get_nowait()
+                except queue.Empty:
+                    break
+            subscription.queue.put_nowait(None)
+
+    def _run(self):
+        # Single shared ticker; exits once the last subscriber leaves
+        while True:
+            with self._lock:
+                if not self.subscribers:
+                    self._thread = None
+                    self._last.clear()
+                    return
+            self.tick()
+            time.sleep(self.interval)
+
+    def tick(self):
+        """Compute each mission update once and fan it out to all subscribers"""
+        with self._lock:
+            subscribers = list(self.subscribers)
+
+        watch_all = any(s.mission_id is None for s in subscribers)
+        current = self.tracker.get_all_missions() if watch_all else {}
+        for mission_id in {s.mission_id for s in subscribers if s.mission_id is not None}:
+            if mission_id not in current:
+                status = self.tracker.get_mission_progress(mission_id)
+                if status:
+                    current[mission_id] = status
+
+        # Field-level deltas against the last pushed state
+        deltas = {}
+        for mission_id, status in current.items():
+            previous = self._last.get(mission_id, {})
+            changed = {k: v for k, v in status.items() if previous.get(k) != v}
+            if changed:
+                deltas[mission_id] = changed
+        removed = [mission_id for mission_id in self._last if mission_id not in current]
+        self._last = current
+
+        # Serialize each distinct message once
+        encoded = {}
+        def message(kind, mission_id, payload):
+            key = (kind, mission_id)
+            if key not in encoded:
+                encoded[key] = f"event: {kind}\ndata: {json.dumps(payload)}\n\n"
+            return encoded[key]
+
+        def snapshot(mission_id):
+            if mission_id is None:
+                return message('snapshot', None, {'missions': current, 'removed': []})
+            return message('snapshot', mission_id, current.get(mission_id, {}))
+
+        for subscription in subscribers:
+            mission_id = subscription.mission_id
+            if not subscription.synced:
+                data = snapshot(mission_id)
+            elif mission_id is None:
+                data = message('delta', None, {'missions': deltas, 'removed': removed})
+            elif mission_id in deltas:
+                data = message('delta', mission_id, deltas[mission_id])
+            else:
+                continue
+            self._push(subscription, data, snapshot)
+
+    def _push(self, subscription, data, snapshot):
+        try:
+            subscription.queue.put_nowait(data)
+            subscription.synced = True
+        except queue.Full:
+            # Slow consumer: drop its backlog and resync with a full snapshot
+            self.dropped_messages += subscription.queue.qsize()
+            while True:
+                try:
+                    subscription.queue.get_nowait()
+                except queue.Empty:
+                    break
+            subscription.queue.put_nowait(snapshot(subscription.mission_id))
+
+    def stream(self, subscription, heartbeat=15):
+        """Yield Server-Sent Events for a subscription until the client disconnects"""
+        try:
+            yield f"retry: {int(self.interval * 1000)}\n\n"
+            while True:
+                try:
+                    data = subscription.queue.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                if data is None:
+                    return
+                yield data
+        finally:
+            self.unsubscribe(subscription)
+
+    def stats(self):
+        """Get broadcaster statistics"""
+        return {
+            'subscribers': len(self.subscribers),
+            'max_subscribers': self.max_subscribers,
+            'dropped_messages': self.dropped_messages
+        }
@@ -1,67 +1,163 @@
 import time
-import numpy as np
-from datetime import datetime, timedelta
+import heapq
+from collections import OrderedDict
+from datetime import datetime
+from itertools import islice
+from threading import Lock
+
+MILESTONES = (25, 50, 75)  # percent complete
+
+class MissionRecord:
+    """Compact per-mission state; rocket references the shared cached trajectory"""
+    __slots__ = ('mission_id', 'target', 'start_time', 'transfer_time', 'rocket', 'status', 'events')
+
+    def __init__(self, mission_id, target, start_time, transfer_time, rocket):
+        self.mission_id = mission_id
+        self.target = target
+        self.start_time = start_time
+        self.transfer_time = transfer_time
+        self.rocket = rocket
+        self.status = 'active'
+        self.events = []
 
 class MissionTracker:
-    def __init__(self):
+    def __init__(self, time_scale=10, archive_size=1000, store=None, trajectory_loader=None, sync_interval=1.0):
+        self.time_scale = time_scale  # simulated days per second
+        self.archive_size = archive_size
         self.active_missions = {}
-        
-    def start_mission(self, mission_id, target, trajectory_data):
-        """Start tracking a new mission"""
-        self.active_missions[mission_id] = {
-            'target': target,
-            'start_time': time.time(),
-            'trajectory': trajectory_data,
-            'current_position': 0,
-            'status': 'active',
-            'events': []
-        }
-        
+        self.archived_missions = OrderedDict()
+        self._schedule = []  # (due_time, seq, record, label)
+        self._seq = 0
+        self._lock = Lock()
+
+        # Optional shared store: missions started by other workers are replayed via trajectory_loader(target)
+        self.store = store
+        self.trajectory_loader = trajectory_loader
+        self.sync_interval = sync_interval
+        self._synced_seq = 0
+        self._last_sync = 0
+        self._sync_lock = Lock()  # one replay at a time, so no row is started twice
+        if store:
+            self.sync()
+
+    def start_mission(self, mission_id, target, trajectory_data, start_time=None):
+        """Start tracking a new mission (start_time is only given when restoring from the store)"""
+        record = MissionRecord(mission_id, target, start_time or time.time(),
+                               trajectory_data['transfer_time'], trajectory_data['rocket'])
+        duration = record.transfer_time / self.time_scale
+        if self.store and start_time is None:
+            self.store.record_mission(mission_id, target, record.start_time, record.start_time + duration)
+        with self._lock:
+            self.archived_missions.pop(mission_id, None)
+            self.active_missions[mission_id] = record
+            for percent in MILESTONES:
+                self._schedule_event(record, record.start_time + duration * percent / 100, f'{percent}% complete')
+            self._schedule_event(record, record.start_time + duration, 'arrived')
+
+    def sync(self, force=False):
+        """Replay missions other workers have committed to the store since the last sync"""
+        if not self.store or (not force and time.time() - self._last_sync < self.sync_interval):
+            return
+        with self._sync_lock:
+            # Another thread may have synced while this one waited
+            if not force and time.time() - self._last_sync < self.sync_interval:
+                return
+            self._last_sync = time.time()
+            for seq, mission_id, target, start_time in self.store.load_missions(self._synced_seq,
+                                                                                self.store.worker_id):
+                self.start_mission(mission_id, target, self.trajectory_loader(target), start_time)
+                self._synced_seq = seq
+
+    def _schedule_event(self, record, due, label):
+        self._seq += 1
+        heapq.heappush(self._schedule, (due, self._seq, record, label))
+
+    def process_events(self, now=None):
+        """Fire due milestone events and archive completed missions"""
+        now = now or time.time()
+        if not self._schedule or self._schedule[0][0] > now:
+            return
+        with self._lock:
+            while self._schedule and self._schedule[0][0] <= now:
+                due, _, record, label = heapq.heappop(self._schedule)
+                if self.active_missions.get(record.mission_id) is not record:
+                    continue  # mission was restarted or evicted
+
+                record.events.append({
+                    'timestamp': datetime.fromtimestamp(due).isoformat(),
+                    'event': label
+                })
+                if label == 'arrived':
+                    record.status = 'completed'
+                    del self.active_missions[record.mission_id]
+                    self.archived_missions[record.mission_id] = record
+                    while len(self.archived_missions) > self.archive_size:
+                        self.archived_missions.popitem(last=False)
+
+    def _find(self, mission_id):
+        return self.active_missions.get(mission_id) or self.archived_missions.get(mission_id)
+
     def get_mission_progress(self, mission_id):
         """Get current mission progress"""
-        if mission_id not in self.active_missions:
+        self.sync()
+        self.process_events()
+        record = self._find(mission_id)
+        if record is None and self.store:
+            # Possibly just started on another worker: look past the sync throttle once
+            self.sync(force=True)
+            self.process_events()
+            record = self._find(mission_id)
+        if record is None:
             return None
-            
-        mission = self.active_missions[mission_id]
-        elapsed = time.time() - mission['start_time']
-        
-        # Scale time (1 second = 10 days for demo)
-        progress = min(elapsed * 10 / mission['trajectory']['transfer_time'], 1.0)
-        
+        return self._progress(record, time.time())
+
+    def _progress(self, record, now):
+        # Clamped at arrival so a finished mission's status stops changing
+        elapsed_days = min((now - record.start_time) * self.time_scale, record.transfer_time)
+        progress = elapsed_days / record.transfer_time
+
         # Calculate current position
-        trajectory_length = len(mission['trajectory']['rocket'])
-        current_index = int(progress * (trajectory_length - 1))
-        
-        if current_index < len(mission['trajectory']['rocket']):
-            current_pos = mission['trajectory']['rocket'][current_index]
-        else:
-            current_pos = mission['trajectory']['rocket'][-1]
-            
+        current_index = int(progress * (len(record.rocket) - 1))
+
         return {
-            'mission_id': mission_id,
+            'mission_id': record.mission_id,
             'progress': progress * 100,
-            'current_position': current_pos,
+            'current_position': record.rocket[current_index],
             'status': 'completed' if progress >= 1.0 else 'active',
-            'elapsed_days': elapsed * 10,
-            'remaining_days': max(0, mission['trajectory']['transfer_time'] - elapsed * 10),
-            'target': mission['target']
+            'elapsed_days': elapsed_days,
+            'remaining_days': max(0, record.transfer_time - elapsed_days),
+            'target': record.target
         }
-    
-    def get_all_missions(self):
-        """Get status of all active missions"""
-        return {mid: self.get_mission_progress(mid) 
-                for mid in self.active_missions.keys()}
-    
+
+    def get_all_missions(self, offset=0, limit=None):
+        """Get status of active missions, optionally one page at a time"""
+        self.sync()
+        self.process_events()
+        now = time.time()
+        stop = None if limit is None else offset + limit
+        with self._lock:
+            page = list(islice(self.active_missions.values(), offset, stop))
+        return {record.mission_id: self._progress(record, now) for record in page}
+
     def add_mission_event(self, mission_id, event):
         """Add event to mission log"""
-        if mission_id in self.active_missions:
-            self.active_missions[mission_id]['events'].append({
+        record = self._find(mission_id)
+        if record:
+            record.events.append({
                 'timestamp': datetime.now().isoformat(),
                 'event': event
             })
-    
+
     def get_mission_events(self, mission_id):
         """Get mission event log"""
-        if mission_id not in self.active_missions:
-            return []
-        return self.active_missions[mission_id]['events']
\ No newline at end of file
+        self.process_events()
+        record = self._find(mission_id)
+        return record.events if record else []
+
+    def stats(self):
+        """Get tracker statistics"""
+        return {
+            'active': len(self.active_missions),
+            'archived': len(self.archived_missions),
+            'scheduled_events': len(self._schedule)
+        }
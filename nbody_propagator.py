@@ -0,0 +1,165 @@
+import time
+import numpy as np
+from orbital_mechanics import DAYS_PER_YEAR, mean_motion, sample_times, transfer_orbit, transfer_time
+
+SUN_MASS = 1.989e30  # kg
+MU_SUN = 4 * np.pi**2  # AU³/year²
+
+# Dormand-Prince 5(4) coefficients
+DP_C = np.array([0, 1/5, 3/10, 4/5, 8/9, 1, 1])
+DP_A = [
+    [],
+    [1/5],
+    [3/40, 9/40],
+    [44/45, -56/15, 32/9],
+    [19372/6561, -25360/2187, 64448/6561, -212/729],
+    [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656],
+    [35/384, 0, 500/1113, 125/192, -2187/6784, 11/84]
+]
+DP_B = np.array([35/384, 0, 500/1113, 125/192, -2187/6784, 11/84, 0])
+DP_E = DP_B - np.array([5179/57600, 0, 7571/16695, 393/640, -92097/339200, 187/2100, 1/40])
+
+class NBodyPropagator:
+    def __init__(self, planets, rtol=1e-9, atol=1e-12):
+        """Propagate a spacecraft under Sun plus planet gravity (planets as in GravityAssist.planets)"""
+        self.names = list(planets)
+        self.distances = np.array([planets[n]['distance'] for n in self.names])
+        mass_ratio = np.array([planets[n]['mass'] for n in self.names]) / SUN_MASS
+        self.mu = MU_SUN * mass_ratio
+        self.omega = mean_motion(self.distances)
+        # Plummer softening at each sphere of influence keeps departure/arrival finite
+        self.softening = self.distances * mass_ratio**0.4
+        self.rtol = rtol
+        self.atol = atol
+
+    def body_positions(self, t, phases):
+        """Heliocentric planet positions at time t (years), shape (bodies, 2)"""
+        theta = phases + self.omega * t
+        return self.distances[:, None] * np.stack([np.cos(theta), np.sin(theta)], axis=-1)
+
+    def derivative(self, t, state, phases):
+        """State derivative [vx, vy, ax, ay] in AU and years"""
+        r, v = state[:2], state[2:]
+        bodies = self.body_positions(t, phases)
+
+        offset = r - bodies
+        dist2 = np.sum(offset**2, axis=1) + self.softening**2
+        accel = -MU_SUN * r / np.dot(r, r)**1.5
+        accel -= np.sum((self.mu / dist2**1.5)[:, None] * offset, axis=0)
+        # Indirect term: the heliocentric frame accelerates with the Sun
+        accel -= np.sum((self.mu / self.distances**3)[:, None] * bodies, axis=0)
+
+        return np.concatenate([v, accel])
+
+    def propagate(self, state0, t_eval, phases):
+        """Integrate with adaptive Dormand-Prince 5(4), returning (states at t_eval, step statistics)
+
+        Step size is set by error control alone; outputs between accepted steps
+        come from cubic Hermite dense output, so step count does not grow with len(t_eval).
+        """
+        stats = {'accepted_steps': 0, 'rejected_steps': 0, 'evaluations': 1,
+                 'min_step': None, 'max_step': None}
+        states = np.empty((len(t_eval), len(state0)))
+        states[0] = state0
+
+        t, y = t_eval[0], np.array(state0, dtype=float)
+        t_end = t_eval[-1]
+        h = (t_end - t) / 100
+        k = np.empty((7, len(y)))
+        k[0] = self.derivative(t, y, phases)
+        out = 1
+
+        while out < len(t_eval):
+            h_step = min(h, t_end - t)
+            for stage in range(1, 7):
+                y_stage = y + h_step * np.dot(DP_A[stage], k[:stage])
+                k[stage] = self.derivative(t + DP_C[stage] * h_step, y_stage, phases)
+            stats['evaluations'] += 6
+
+            y_new = y + h_step * np.dot(DP_B, k)
+            scale = self.atol + self.rtol * np.maximum(np.abs(y), np.abs(y_new))
+            error = np.sqrt(np.mean((h_step * np.dot(DP_E, k) / scale)**2))
+
+            if error <= 1:
+                t_new = t_end if t_end - t <= h_step else t + h_step
+                last = np.searchsorted(t_eval, t_new, side='right')
+                if last > out:
+                    s = ((t_eval[out:last] - t) / h_step)[:, None]
+                    states[out:last] = ((2*s**3 - 3*s**2 + 1) * y + (s**3 - 2*s**2 + s) * h_step * k[0]
+                                        + (3*s**2 - 2*s**3) * y_new + (s**3 - s**2) * h_step * k[6])
+                    out = last
+
+                t, y = t_new, y_new
+                k[0] = k[6]  # first-same-as-last
+                stats['accepted_steps'] += 1
+                stats['min_step'] = float(min(stats['min_step'] or h_step, h_step))
+                stats['max_step'] = float(max(stats['max_step'] or h_step, h_step))
+            else:
+                stats['rejected_steps'] += 1
+
+            factor = 5 if error == 0 else 0.9 * error**-0.2
+            h = h_step * min(5, max(0.2, factor))
+
+        return states, stats
+
+    def mission(self, target, steps=200):
+        """Propagate an Earth-to-target Hohmann departure, shaped like calculate_mission"""
+        earth = self.names.index('earth')
+        goal = self.names.index(target)
+        a_earth, a_target = self.distances[earth], self.distances[goal]
+        a_transfer, _ = transfer_orbit(a_earth, a_target)
+        t_transfer = transfer_time(a_earth, a_target)
+
+        phases = np.zeros(len(self.names))
+        phases[goal] = np.pi - self.omega[goal] * t_transfer
+
+        # Prograde departure burn from Earth's position into the transfer ellipse
+        v_depart = np.sqrt(MU_SUN * (2 / a_earth - 1 / a_transfer))
+        state0 = np.array([a_earth, 0.0, 0.0, v_depart])
+
+        t = sample_times(t_transfer, steps)
+        states, stats = self.propagate(state0, t, phases)
+        theta = phases[:, None] + self.omega[:, None] * t
+        orbits = self.distances[:, None, None] * np.stack([np.cos(theta), np.sin(theta)], axis=-1)
+        earth_pos, target_pos = orbits[earth], orbits[goal]
+        positions = np.stack([earth_pos, target_pos, states[:, :2]])
+
+        return {
+            'earth': list(zip(earth_pos[:, 0].tolist(), earth_pos[:, 1].tolist())),
+            'target': list(zip(target_pos[:, 0].tolist(), target_pos[:, 1].tolist())),
+            'rocket': list(zip(states[:, 0].tolist(), states[:, 1].tolist())),
+            'transfer_time': float(t_transfer) * DAYS_PER_YEAR,
+            'max_distance': float(np.max(np.hypot(states[:, 0], states[:, 1]))),
+            'integrator': stats
+        }, positions
+
+def benchmark(simulator, targets=('venus', 'mars', 'jupiter'), steps=(50, 200, 1000)):
+    """Compare N-body propagation against the analytic path: wall time and arrival offset"""
+    propagator = NBodyPropagator(simulator.gravity_assist.planets)
+    report = []
+    for target in targets:
+        for n in steps:
+            start = time.perf_counter()
+            _, analytic = simulator._compute_batch([(target, n)])[0]
+            analytic_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            result, nbody = propagator.mission(target, n)
+            nbody_ms = (time.perf_counter() - start) * 1000
+
+            report.append({
+                'target': target,
+                'steps': n,
+                'analytic_ms': analytic_ms,
+                'nbody_ms': nbody_ms,
+                'arrival_offset_au': float(np.linalg.norm(nbody[2, -1] - analytic[2, -1])),
+                'integrator': result['integrator']
+            })
+    return report
+
+if __name__ == '__main__':
+    from app import simulator
+    for row in benchmark(simulator):
+        print(f"{row['target']:8} {row['steps']:5} steps  analytic {row['analytic_ms']:7.2f} ms  "
+              f"n-body {row['nbody_ms']:8.2f} ms  offset {row['arrival_offset_au']:.4f} AU  "
+              f"steps {row['integrator']['accepted_steps']}/{row['integrator']['rejected_steps']} rejected")
@@ -0,0 +1,98 @@
+"""Vectorized two-body kernels shared by the simulator, CLI, launch optimizer and fuel calculator
+
+Every kernel accepts scalars or NumPy arrays and broadcasts. Powers and roots go
+through NumPy ufuncs (never Python's ** on floats) so a scalar call and the same
+value inside a batch give bit-identical answers.
+"""
+import numpy as np
+from config import PLANETS
+
+AU_KM = 149597870.7
+MU_SUN_KM = 1.32712440018e11  # km³/s²
+DAYS_PER_YEAR = 365.25
+EARTH_DISTANCE = 1.0  # AU
+
+def orbital_period(a):
+    """Orbital period (years) for semi-major axis a (AU), Kepler's third law"""
+    return np.power(np.asarray(a, dtype=float), 1.5)
+
+def mean_motion(a):
+    """Angular rate (rad/year) of a circular orbit of radius a (AU)"""
+    return 2 * np.pi / orbital_period(a)
+
+def synodic_period(period_1, period_2):
+    """Time between repeats of the same relative geometry, in the units of the periods"""
+    return np.abs(1 / (1 / np.asarray(period_1, dtype=float) - 1 / np.asarray(period_2, dtype=float)))
+
+def transfer_orbit(r1, r2):
+    """Semi-major axis (AU) and eccentricity of the Hohmann ellipse between radii r1 and r2"""
+    r1, r2 = np.asarray(r1, dtype=float), np.asarray(r2, dtype=float)
+    return (r1 + r2) / 2, np.abs(r2 - r1) / (r1 + r2)
+
+def transfer_time(r1, r2):
+    """Hohmann transfer time (years): half the transfer orbit's period"""
+    a_transfer, _ = transfer_orbit(r1, r2)
+    return orbital_period(a_transfer) / 2
+
+def circular_velocity(r, mu=MU_SUN_KM):
+    """Circular orbit speed (km/s) at radius r (AU)"""
+    return np.sqrt(mu / (np.asarray(r, dtype=float) * AU_KM))
+
+def hohmann_delta_v(r1, r2, mu=MU_SUN_KM):
+    """Departure and arrival burns (km/s) for a Hohmann transfer between radii r1 and r2 (AU)"""
+    r1_km = np.asarray(r1, dtype=float) * AU_KM
+    r2_km = np.asarray(r2, dtype=float) * AU_KM
+    a_transfer = (r1_km + r2_km) / 2
+    v_transfer_1 = np.sqrt(mu * (2 / r1_km - 1 / a_transfer))
+    v_transfer_2 = np.sqrt(mu * (2 / r2_km - 1 / a_transfer))
+    return np.abs(v_transfer_1 - np.sqrt(mu / r1_km)), np.abs(np.sqrt(mu / r2_km) - v_transfer_2)
+
+def sample_times(t_end, num_steps, start=0, stop=None):
+    """Rows of np.linspace(0, t_end, num_steps)[start:stop] without building whole rows
+
+    With array t_end/num_steps the result is a padded (jobs, columns) grid; columns
+    past a row's num_steps are padding.
+    """
+    t_end = np.asarray(t_end, dtype=float)
+    num_steps = np.asarray(num_steps)
+    index = np.arange(start, int(num_steps.max()) if stop is None else stop)
+    last = np.where(num_steps > 1, num_steps - 1, -1)[..., None]
+    t = index * (t_end / np.maximum(num_steps - 1, 1))[..., None]
+    return np.where(index == last, t_end[..., None], t)
+
+def transfer_positions(a_target, t, a_earth=EARTH_DISTANCE):
+    """Earth, target and rocket (x, y) positions at times t (years) after departure
+
+    The target is phased to meet the rocket at the far side of the transfer
+    ellipse. a_target broadcasts against t, e.g. shape (jobs, 1) against a
+    (jobs, steps) time grid.
+    """
+    a_target = np.asarray(a_target, dtype=float)
+    omega_earth, omega_target = mean_motion(a_earth), mean_motion(a_target)
+    a_transfer, e = transfer_orbit(a_earth, a_target)
+    t_transfer = orbital_period(a_transfer) / 2
+
+    theta_earth = omega_earth * t
+    theta_target = (np.pi - omega_target * t_transfer) + omega_target * t
+    theta_rocket = np.pi * t / t_transfer
+    r_rocket = a_transfer * (1 - e**2) / (1 + e * np.cos(theta_rocket))
+    return (
+        (a_earth * np.cos(theta_earth), a_earth * np.sin(theta_earth)),
+        (a_target * np.cos(theta_target), a_target * np.sin(theta_target)),
+        (r_rocket * np.cos(theta_rocket), r_rocket * np.sin(theta_rocket))
+    )
+
+def _planet_constants(a):
+    dv1, dv2 = hohmann_delta_v(EARTH_DISTANCE, a)
+    return {
+        'distance': a,
+        'period_days': float(orbital_period(a)) * DAYS_PER_YEAR,
+        'mean_motion': float(mean_motion(a)),
+        'transfer_time': float(transfer_time(EARTH_DISTANCE, a)),  # years
+        'departure_dv': float(dv1),
+        'arrival_dv': float(dv2)
+    }
+
+# Per-planet constants for Earth-departure transfers, computed once at import
+EARTH = _planet_constants(EARTH_DISTANCE)
+PLANET_CONSTANTS = {name: _planet_constants(planet['distance']) for name, planet in PLANETS.items()}
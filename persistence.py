@@ -0,0 +1,206 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS simulations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    worker TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    target TEXT NOT NULL,
+    transfer_time REAL,
+    fuel_dv REAL,
+    fuel_mass REAL,
+    efficiency REAL,
+    config TEXT
+);
+CREATE TABLE IF NOT EXISTS missions (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    worker TEXT NOT NULL,
+    mission_id TEXT NOT NULL,
+    target TEXT NOT NULL,
+    start_time REAL NOT NULL,
+    end_time REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS missions_end_time ON missions (end_time);
+"""
+
+class MissionStore:
+    """SQLite (WAL) store for analytics history and tracked missions
+
+    Writes are queued and committed in batches by a background flusher thread,
+    so request handlers never wait on disk. Several worker processes can share
+    one database file; rows carry the writing worker's id so each process can
+    pull in the others' rows incrementally.
+    """
+
+    def __init__(self, path, batch_size=500, history_limit=10000, mission_retention=86400,
+                 compact_interval=300):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.batch_size = batch_size
+        self.history_limit = history_limit
+        self.mission_retention = mission_retention
+        self.compact_interval = compact_interval
+        self.worker_id = f'{os.getpid()}-{uuid.uuid4().hex[:8]}'
+        self.rows_written = 0
+
+        self._reader = self._connect()
+        self._reader.executescript(SCHEMA)
+        self._read_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._closed = False
+        self._close_lock = threading.Lock()  # orders enqueues against close()
+        self._thread = threading.Thread(target=self._run, name='store-flusher', daemon=True)
+        self._thread.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def record_simulation(self, timestamp, target, transfer_time, fuel_dv, fuel_mass, efficiency, config):
+        """Queue one analytics row"""
+        self._put(('simulations', (self.worker_id, timestamp, target, float(transfer_time),
+                                         float(fuel_dv), float(fuel_mass), float(efficiency), json.dumps(config))))
+
+    def record_mission(self, mission_id, target, start_time, end_time):
+        """Queue one tracked-mission row"""
+        self._put(('missions', (self.worker_id, mission_id, target, start_time, end_time)))
+
+    def _put(self, item):
+        with self._close_lock:
+            if self._closed:
+                print(f"Warning: store is closed, dropping {item[0]} row")
+            elif self._thread.is_alive():
+                self._queue.put(item)
+            else:
+                # Flusher is gone: write through instead of queueing rows nobody will commit
+                self._write_now([item])
+
+    def _write(self, conn, rows):
+        with conn:
+            simulations = [row for table, row in rows if table == 'simulations']
+            missions = [row for table, row in rows if table == 'missions']
+            if simulations:
+                conn.executemany('INSERT INTO simulations (worker, timestamp, target, transfer_time, fuel_dv, '
+                                 'fuel_mass, efficiency, config) VALUES (?, ?, ?, ?, ?, ?, ?, ?)', simulations)
+            if missions:
+                conn.executemany('INSERT INTO missions (worker, mission_id, target, start_time, end_time) '
+                                 'VALUES (?, ?, ?, ?, ?)', missions)
+        self.rows_written += len(rows)
+
+    def _write_now(self, rows):
+        try:
+            with self._read_lock:
+                self._write(self._reader, rows)
+        except sqlite3.Error as e:
+            print(f"Warning: store write failed: {e}")
+
+    def _drain(self):
+        """Commit whatever is still queued on the calling thread"""
+        rows = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._queue.task_done()
+            if item is not None:
+                rows.append(item)
+        if rows:
+            self._write_now(rows)
+
+    def _run(self):
+        conn = self._connect()
+        last_compact = time.time()
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                break
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = None in batch
+            rows = [entry for entry in batch if entry is not None]
+            try:
+                self._write(conn, rows)
+                if time.time() - last_compact > self.compact_interval:
+                    self.compact(conn)
+                    last_compact = time.time()
+            except Exception as e:
+                # Keep the flusher alive whatever goes wrong, or flush() would wait forever
+                print(f"Warning: store write failed: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                break
+        conn.close()
+
+    def compact(self, conn=None):
+        """Drop analytics rows past history_limit and long-finished missions"""
+        conn = conn or self._reader
+        with conn:
+            conn.execute('DELETE FROM simulations WHERE id <= (SELECT MAX(id) FROM simulations) - ?',
+                         (self.history_limit,))
+            conn.execute('DELETE FROM missions WHERE end_time < ?', (time.time() - self.mission_retention,))
+
+    def flush(self):
+        """Block until every queued row is committed (no-op once closed)"""
+        if self._closed:
+            return
+        if self._thread.is_alive():
+            self._queue.join()
+        else:
+            self._drain()
+
+    def close(self):
+        """Flush pending rows and stop the flusher thread; later writes are dropped"""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._drain()
+        with self._read_lock:
+            self._reader.close()
+
+    def load_simulations(self, after_id=0, limit=100):
+        """Return up to the newest `limit` analytics rows with id > after_id, oldest first"""
+        with self._read_lock:
+            rows = self._reader.execute(
+                'SELECT id, timestamp, target, transfer_time, fuel_dv, fuel_mass, efficiency, config '
+                'FROM simulations WHERE id > ? ORDER BY id DESC LIMIT ?', (after_id, limit)).fetchall()
+        return [(row_id, timestamp, target, transfer_time, fuel_dv, fuel_mass, efficiency, json.loads(config))
+                for row_id, timestamp, target, transfer_time, fuel_dv, fuel_mass, efficiency, config in reversed(rows)]
+
+    def load_missions(self, after_seq=0, exclude_worker=None):
+        """Return mission rows (seq, mission_id, target, start_time) with seq > after_seq, oldest first"""
+        with self._read_lock:
+            return self._reader.execute(
+                'SELECT seq, mission_id, target, start_time FROM missions '
+                'WHERE seq > ? AND worker IS NOT ? ORDER BY seq', (after_seq, exclude_worker)).fetchall()
+
+    def stats(self):
+        """Get store statistics"""
+        return {
+            'path': self.path,
+            'worker_id': self.worker_id,
+            'pending_writes': self._queue.qsize(),
+            'rows_written': self.rows_written
+        }
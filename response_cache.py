@@ -0,0 +1,71 @@
+import hashlib
+import threading
+from flask import Response
+
+class CachedBody:
+    __slots__ = ('body', 'etag', 'version')
+
+    def __init__(self, body, version):
+        self.body = body
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self.version = version
+
+class ResponseCache:
+    """Pre-serialized JSON bodies with strong ETags for data that rarely changes
+
+    A body is built and encoded once per (key, version); bumping the version
+    (e.g. the date for daily data) or calling invalidate() rebuilds it on the
+    next request. Conditional requests whose If-None-Match carries the current
+    ETag get an empty 304.
+    """
+
+    def __init__(self, dumps, max_age=3600):
+        self.dumps = dumps
+        self.max_age = max_age
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, producer, version=None):
+        """Cached body for key, calling producer() to rebuild when missing or stale"""
+        entry = self.entries.get(key)
+        if entry is not None and entry.version == version:
+            self.hits += 1
+            return entry
+        body = (self.dumps(producer()) + '\n').encode()
+        with self._lock:
+            self.misses += 1
+            entry = self.entries[key] = CachedBody(body, version)
+        return entry
+
+    def respond(self, request, key, producer, version=None, max_age=None):
+        """200 with the cached body, or 304 when the client already holds it"""
+        entry = self.get(key, producer, version)
+        response = Response(entry.body, mimetype='application/json')
+        response.set_etag(entry.etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = self.max_age if max_age is None else max_age
+        response = response.make_conditional(request)
+        if response.status_code == 304:
+            self.not_modified += 1
+        return response
+
+    def invalidate(self, prefix=None):
+        """Drop every entry, or only those whose key tuple begins with prefix"""
+        with self._lock:
+            stale = [key for key in self.entries if prefix is None or key[0] == prefix]
+            for key in stale:
+                del self.entries[key]
+        return len(stale)
+
+    def stats(self):
+        """Get response cache statistics"""
+        return {
+            'entries': len(self.entries),
+            'bytes': sum(len(entry.body) for entry in self.entries.values()),
+            'hits': self.hits,
+            'misses': self.misses,
+            'not_modified': self.not_modified
+        }
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""Production server: one worker process per core, all sharing the SQLite mission store
+
+    python serve.py [--workers N] [--threads N] [--host HOST] [--port PORT]
+
+Runs gunicorn (gthread workers) when it is installed, otherwise a pre-fork pool
+of threaded werkzeug servers accepting on one shared socket. A gthread worker
+has a fixed number of request threads and each open /mission-stream holds one,
+so streams are capped at that count minus STREAM_RESERVED_THREADS. Each worker imports
+the app after forking, so every process owns its own store connection and
+background threads, then pre-warms its trajectory cache before taking traffic.
+Tracker and analytics state is read back from the shared store, so any worker
+answers /active-missions and /analytics the same way. SIGTERM or Ctrl-C stops
+accepting, ends live streams, drains in-flight requests and flushes the store.
+"""
+import argparse
+import importlib.util
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from datetime import datetime
+from config import (HOST, PORT, FEATURES, EPHEMERIS_CACHE_DIR, EPHEMERIS_START, EPHEMERIS_END,
+                    EPHEMERIS_STEP_DAYS, SERVER_WORKERS, SERVER_THREADS, SERVER_GRACEFUL_TIMEOUT)
+
+def prepare_shared_caches():
+    """Build on-disk caches once in the parent, so workers memory-map one shared copy"""
+    if FEATURES.get('ephemeris') and EPHEMERIS_CACHE_DIR:
+        from ephemeris import Ephemeris
+        Ephemeris(EPHEMERIS_CACHE_DIR, datetime.strptime(EPHEMERIS_START, '%Y-%m-%d'),
+                  datetime.strptime(EPHEMERIS_END, '%Y-%m-%d'), EPHEMERIS_STEP_DAYS)
+
+def load_app(threads=None):
+    """Import the app in this worker and warm its trajectory cache
+
+    threads is the worker's fixed request-thread count, if it has one; SSE
+    streams are then capped so they can never occupy every thread.
+    """
+    from app import app, simulator, prewarm_responses
+    warmed = simulator.prewarm()
+    bodies = prewarm_responses()
+    streams = f", up to {simulator.limit_streams(threads)} streams" if threads else ''
+    print(f"[worker {os.getpid()}] ready, {warmed} trajectories and {bodies} static responses cached{streams}")
+    return app, simulator
+
+def end_streams(simulator):
+    # Long-lived SSE responses would otherwise hold the drain open until the timeout
+    broadcaster = simulator.subsystems.peek('broadcaster')
+    if broadcaster:
+        broadcaster.close()
+
+def run_gunicorn(host, port, workers, threads, graceful_timeout):
+    from gunicorn.app.base import BaseApplication
+
+    state = {}
+
+    def post_worker_init(worker):
+        previous = signal.getsignal(signal.SIGTERM)
+        def handle_term(signum, frame):
+            end_streams(state['simulator'])
+            previous(signum, frame)
+        signal.signal(signal.SIGTERM, handle_term)
+
+    class Application(BaseApplication):
+        def load_config(self):
+            for key, value in {
+                'bind': f'{host}:{port}',
+                'workers': workers,
+                'threads': threads,
+                'worker_class': 'gthread',
+                'graceful_timeout': graceful_timeout,
+                'on_starting': lambda server: prepare_shared_caches(),
+                'post_worker_init': post_worker_init,
+                'worker_exit': lambda server, worker: state['simulator'].close()
+            }.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            app, state['simulator'] = load_app(threads)
+            return app
+
+    Application().run()
+
+def serve_worker(sock, host, port, graceful_timeout):
+    """Worker process body: threaded werkzeug server on the inherited socket"""
+    from werkzeug.serving import make_server
+    for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGALRM):
+        signal.signal(signum, signal.SIG_DFL)
+    app, simulator = load_app()
+    server = make_server(host, port, app, threaded=True, fd=sock.fileno())
+    server.daemon_threads = False  # so server_close() waits for in-flight requests
+
+    def stop(signum, frame):
+        end_streams(simulator)
+        threading.Thread(target=server.shutdown, daemon=True).start()
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    server.serve_forever()
+    drain = threading.Thread(target=server.server_close, daemon=True)
+    drain.start()
+    drain.join(graceful_timeout)
+    simulator.close()
+
+def run_prefork(host, port, workers, graceful_timeout):
+    """Fork workers onto one listening socket; restart crashed ones, drain all on SIGTERM"""
+    prepare_shared_caches()
+    sock = socket.create_server((host, port), backlog=2048)
+    children = set()
+    stopping = []
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                serve_worker(sock, host, port, graceful_timeout)
+                code = 0
+            finally:
+                os._exit(code)
+        children.add(pid)
+
+    def stop(signum, frame):
+        if stopping:
+            return
+        stopping.append(signum)
+        print(f"Shutting down {len(children)} workers (up to {graceful_timeout}s to drain)...")
+        for pid in list(children):
+            os.kill(pid, signal.SIGTERM)
+        signal.alarm(graceful_timeout + 5)
+
+    def kill(signum, frame):
+        for pid in list(children):
+            os.kill(pid, signal.SIGKILL)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGALRM, kill)
+    for _ in range(workers):
+        spawn()
+    print(f"🚀 Serving on http://{host}:{port} with {workers} workers")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        children.discard(pid)
+        if not stopping:
+            print(f"Worker {pid} exited (status {status}), restarting")
+            time.sleep(1)
+            spawn()
+    sock.close()
+
+def run_single(host, port):
+    """Fallback without fork (e.g. Windows): one threaded process"""
+    from werkzeug.serving import make_server
+    prepare_shared_caches()
+    app, simulator = load_app()
+    server = make_server(host, port, app, threaded=True)
+    print(f"🚀 Serving on http://{host}:{port} (single process)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        end_streams(simulator)
+        server.server_close()
+        simulator.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Rocket Simulation production server')
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--workers', type=int, default=SERVER_WORKERS, help='Worker processes (0 = one per core)')
+    parser.add_argument('--threads', type=int, default=SERVER_THREADS, help='Request threads per gunicorn worker')
+    parser.add_argument('--graceful-timeout', type=int, default=SERVER_GRACEFUL_TIMEOUT)
+    parser.add_argument('--server', choices=['auto', 'gunicorn', 'prefork', 'single'], default='auto')
+    args = parser.parse_args(argv)
+    workers = args.workers or os.cpu_count() or 1
+
+    server = args.server
+    if server == 'auto':
+        if importlib.util.find_spec('gunicorn'):
+            server = 'gunicorn'
+        else:
+            server = 'prefork' if hasattr(os, 'fork') else 'single'
+
+    if server == 'gunicorn':
+        run_gunicorn(args.host, args.port, workers, args.threads, args.graceful_timeout)
+    elif server == 'prefork':
+        run_prefork(args.host, args.port, workers, args.graceful_timeout)
+    else:
+        run_single(args.host, args.port)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
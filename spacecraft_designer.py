@@ -1,3 +1,14 @@
+import numpy as np
+
+BASE_MASS = 100  # kg, structure
+BASE_COST = 500000
+ENGINE_BONUS = {'ion': 30, 'nuclear': 20}  # performance points by engine
+POWER_BONUS = {'nuclear': 15, 'rtg': 10}
+
+def mass_score(total_mass):
+    """Performance points for dry mass: light designs gain, heavy ones lose (scalar or array)"""
+    return np.where(total_mass < 2000, 20, np.where(total_mass > 5000, -10, 0))
+
 class SpacecraftDesigner:
     def __init__(self):
         self.components = {
@@ -25,8 +36,8 @@ class SpacecraftDesigner:
     
     def design_spacecraft(self, config):
         """Design spacecraft based on configuration"""
-        total_mass = 100  # Base structure
-        total_cost = 500000  # Base cost
+        total_mass = BASE_MASS  # Base structure
+        total_cost = BASE_COST  # Base cost
         capabilities = []
         
         # Engine
@@ -75,24 +86,13 @@ class SpacecraftDesigner:
         base_score = 50
         
         # Engine efficiency
-        engine = config.get('engine', 'chemical')
-        if engine == 'ion':
-            base_score += 30
-        elif engine == 'nuclear':
-            base_score += 20
+        base_score += ENGINE_BONUS.get(config.get('engine', 'chemical'), 0)
         
         # Mass efficiency
-        if total_mass < 2000:
-            base_score += 20
-        elif total_mass > 5000:
-            base_score -= 10
+        base_score += int(mass_score(total_mass))
         
         # Power system
-        power = config.get('power', 'solar')
-        if power == 'nuclear':
-            base_score += 15
-        elif power == 'rtg':
-            base_score += 10
+        base_score += POWER_BONUS.get(config.get('power', 'solar'), 0)
         
         return min(100, max(0, base_score))
     
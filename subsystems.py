@@ -0,0 +1,88 @@
+import importlib
+import sys
+import threading
+import time
+
+class Subsystem:
+    __slots__ = ('name', 'module', 'factory', 'feature')
+
+    def __init__(self, name, module, factory, feature=None):
+        self.name = name
+        self.module = module
+        self.factory = factory  # factory(module) -> instance, or None when a dependency is missing
+        self.feature = feature  # config.FEATURES key, None for always on
+
+class SubsystemRegistry:
+    """Imports and constructs optional components on first use
+
+    Each component has its own feature flag and failure scope: a disabled flag,
+    an ImportError or a constructor error makes only that component None (its
+    routes answer 503) and is kept for report(), while everything else works.
+    """
+
+    def __init__(self, features):
+        self.features = features
+        self.specs = {}
+        self.instances = {}
+        self.status = {}
+        self._lock = threading.RLock()  # factories resolve their own dependencies re-entrantly
+
+    def register(self, name, module, factory, feature=None):
+        self.specs[name] = Subsystem(name, module, factory, feature)
+
+    def get(self, name):
+        """The component, built on first call; None when disabled or broken"""
+        try:
+            return self.instances[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self.instances:
+                self.instances[name] = self._build(self.specs[name])
+            return self.instances[name]
+
+    def peek(self, name):
+        """The component if it has been built, without building it"""
+        return self.instances.get(name)
+
+    def load_all(self):
+        for name in self.specs:
+            self.get(name)
+
+    def _build(self, spec):
+        if spec.feature and not self.features.get(spec.feature):
+            self.status[spec.name] = {'state': 'disabled'}
+            return None
+        cached = spec.module in sys.modules
+        start = time.perf_counter()
+        try:
+            module = importlib.import_module(spec.module)
+            imported = time.perf_counter()
+            instance = spec.factory(module)
+        except Exception as e:
+            self.status[spec.name] = {'state': 'failed', 'error': f'{type(e).__name__}: {e}'}
+            print(f"Warning: {spec.name} unavailable ({type(e).__name__}: {e})")
+            return None
+        self.status[spec.name] = {
+            'state': 'loaded' if instance is not None else 'unavailable',  # a dependency is off
+            'import_ms': 0.0 if cached else (imported - start) * 1000,
+            'init_ms': (time.perf_counter() - imported) * 1000
+        }
+        return instance
+
+    def report(self):
+        """Per-component feature flag, state, and import/construction time in ms"""
+        return {name: {'module': spec.module, 'feature': spec.feature,
+                       **self.status.get(name, {'state': 'not loaded'})}
+                for name, spec in self.specs.items()}
+
+class Lazy:
+    """Class attribute that resolves to owner.subsystems.get(<attribute name>)"""
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        return obj.subsystems.get(self.name)
@@ -0,0 +1,25 @@
+import io
+
+import pytest
+
+from mission_database import MissionDatabase
+
+HEADER = b'id,name,launch_date,target,duration_days,distance_au\n'
+
+@pytest.mark.parametrize('duration, distance', [
+    (b'nan', b'1.5'), (b'inf', b'1.5'), (b'-inf', b'1.5'), (b'200', b'nan'), (b'0', b'1.5'), (b'200', b'-1')
+])
+def test_import_rejects_non_finite_or_non_positive_numbers(duration, distance):
+    db = MissionDatabase()
+    before = dict(db.missions)
+    row = b'probe,Probe,2030-01-01,mars,' + duration + b',' + distance + b'\n'
+    with pytest.raises(ValueError, match='Row 1'):
+        db.import_stream(io.BytesIO(HEADER + row), 'csv')
+    assert db.missions == before
+
+def test_import_accepts_finite_numbers_and_blanks():
+    db = MissionDatabase()
+    csv = HEADER + b'probe,Probe,2030-01-01,mars,200,1.5\nlander,Lander,2031-01-01,mars,,\n'
+    assert db.import_stream(io.BytesIO(csv), 'csv') == ['probe', 'lander']
+    assert db.missions['probe']['duration_days'] == 200
+    assert db.missions['lander']['distance_au'] is None
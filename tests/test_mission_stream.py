@@ -0,0 +1,39 @@
+import time
+
+from mission_stream import MissionBroadcaster, Subscription
+from mission_tracker import MissionTracker
+
+TRAJECTORY = {'transfer_time': 100.0, 'rocket': [[0.0, 0.0], [0.5, 0.5], [1.0, 1.0]]}
+
+def finished_tracker():
+    tracker = MissionTracker(time_scale=10)
+    tracker.start_mission('m1', 'mars', TRAJECTORY, start_time=time.time() - 60)  # arrived 50 s ago
+    return tracker
+
+def drain(subscription):
+    messages = []
+    while not subscription.queue.empty():
+        messages.append(subscription.queue.get_nowait())
+    return messages
+
+def test_completed_mission_status_is_frozen():
+    tracker = finished_tracker()
+    first = tracker.get_mission_progress('m1')
+    time.sleep(0.01)
+    assert tracker.get_mission_progress('m1') == first
+    assert first['status'] == 'completed'
+    assert first['elapsed_days'] == TRAJECTORY['transfer_time']
+    assert first['remaining_days'] == 0
+
+def test_completed_mission_produces_no_further_deltas():
+    broadcaster = MissionBroadcaster(finished_tracker())
+    # Drive tick() by hand rather than through subscribe(), which starts the ticker thread
+    subscription = Subscription('m1', broadcaster.queue_size)
+    broadcaster.subscribers.add(subscription)
+
+    broadcaster.tick()
+    assert [m.split('\n')[0] for m in drain(subscription)] == ['event: snapshot']
+    for _ in range(3):
+        time.sleep(0.01)
+        broadcaster.tick()
+    assert drain(subscription) == []
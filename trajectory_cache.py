@@ -0,0 +1,57 @@
+from collections import OrderedDict
+from threading import Lock
+
+class TrajectoryCache:
+    def __init__(self, max_size=64):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = Lock()
+
+    def get(self, key):
+        """Return cached value for key, or None on a miss"""
+        with self._lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+
+    def put(self, key, value):
+        """Store value, evicting least recently used entries past max_size"""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, target=None):
+        """Drop all entries, or only those for one target planet"""
+        with self._lock:
+            if target is None:
+                removed = len(self.entries)
+                self.entries.clear()
+            else:
+                stale = [key for key in self.entries if key[0] == target]
+                for key in stale:
+                    del self.entries[key]
+                removed = len(stale)
+        return removed
+
+    def stats(self):
+        """Get cache statistics"""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self.entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups * 100 if lookups else 0
+        }
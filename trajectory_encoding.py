@@ -0,0 +1,54 @@
+import gzip
+import json
+import struct
+import zlib
+import numpy as np
+
+MEDIA_TYPE = 'application/vnd.rocket-sim.trajectory'
+MAGIC = b'RSTJ'
+BODIES = ('earth', 'target', 'rocket')
+DTYPES = {'float32': '<f4', 'float64': '<f8'}
+ENCODINGS = ('gzip', 'deflate')
+
+def encode_trajectory(result, positions, dtype='float32'):
+    """Pack trajectory positions into a binary payload with a small JSON header
+
+    Layout: 4-byte magic, uint32 header length, UTF-8 JSON header padded so the
+    array data starts on an 8-byte boundary, then the (bodies, steps, 2) array
+    as little-endian floats in C order.
+    """
+    if dtype not in DTYPES:
+        raise ValueError(f'Unsupported dtype: {dtype}')
+
+    data = np.ascontiguousarray(positions, dtype=DTYPES[dtype])
+    header = {
+        'dtype': dtype,
+        'bodies': list(BODIES),
+        'shape': list(data.shape),
+        **{k: v for k, v in result.items() if k not in BODIES}
+    }
+    header_bytes = json.dumps(header).encode('utf-8')
+    header_bytes += b' ' * (-(len(MAGIC) + 4 + len(header_bytes)) % 8)
+
+    return MAGIC + struct.pack('<I', len(header_bytes)) + header_bytes + data.tobytes()
+
+def decode_trajectory(payload):
+    """Unpack a binary trajectory payload into (header, positions array)"""
+    if payload[:len(MAGIC)] != MAGIC:
+        raise ValueError('Not a trajectory payload')
+
+    (header_length,) = struct.unpack_from('<I', payload, len(MAGIC))
+    offset = len(MAGIC) + 4
+    header = json.loads(payload[offset:offset + header_length])
+    positions = np.frombuffer(payload, dtype=DTYPES[header['dtype']], offset=offset + header_length)
+    return header, positions.reshape(header['shape'])
+
+def compress_payload(payload, encoding=None):
+    """Apply optional gzip or deflate content encoding"""
+    if encoding is None:
+        return payload
+    if encoding == 'gzip':
+        return gzip.compress(payload, compresslevel=6)
+    if encoding == 'deflate':
+        return zlib.compress(payload, 6)
+    raise ValueError(f'Unsupported encoding: {encoding}')
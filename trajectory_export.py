@@ -0,0 +1,60 @@
+import io
+import numpy as np
+
+BODIES = ('earth', 'target', 'rocket')
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+    'npy': 'application/octet-stream'
+}
+CHUNK_STEPS = 4096
+
+def array_chunks(positions, chunk_steps=CHUNK_STEPS):
+    """Split a (bodies, steps, 2) positions array into (start, (n, bodies, 2)) chunks"""
+    steps = positions.shape[1]
+    for start in range(0, steps, chunk_steps):
+        yield start, positions[:, start:start + chunk_steps].transpose(1, 0, 2)
+
+def npy_header(steps, dtype='<f8'):
+    """Header for a C-order (steps, bodies, 2) .npy file, so the data that follows can be streamed"""
+    buffer = io.BytesIO()
+    np.lib.format.write_array_header_1_0(buffer, {
+        'descr': dtype, 'fortran_order': False, 'shape': (steps, len(BODIES), 2)
+    })
+    return buffer.getvalue()
+
+def export_chunks(chunks, fmt, steps):
+    """Encode a stream of (start, (n, bodies, 2)) chunks as byte blocks
+
+    Only one chunk is held at a time, so memory stays flat however many steps
+    there are. npy output is a standard .npy file that downstream tools can
+    open with np.load(path, mmap_mode='r').
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f'Unsupported export format: {fmt}')
+
+    if fmt == 'npy':
+        yield npy_header(steps)
+    elif fmt == 'csv':
+        yield ('step,' + ','.join(f'{body}_{axis}' for body in BODIES for axis in 'xy') + '\n').encode()
+
+    for start, chunk in chunks:
+        if fmt == 'npy':
+            yield np.ascontiguousarray(chunk, dtype='<f8').tobytes()
+            continue
+        rows = chunk.reshape(len(chunk), -1).tolist()
+        if fmt == 'csv':
+            lines = ['%d,%r,%r,%r,%r,%r,%r\n' % (start + i, *row) for i, row in enumerate(rows)]
+        else:
+            lines = ['{"step": %d, "earth": [%r, %r], "target": [%r, %r], "rocket": [%r, %r]}\n' % (start + i, *row)
+                     for i, row in enumerate(rows)]
+        yield ''.join(lines).encode()
+
+def write_export(path, chunks, fmt, steps):
+    """Write an export to disk chunk by chunk; returns bytes written"""
+    written = 0
+    with open(path, 'wb') as f:
+        for block in export_chunks(chunks, fmt, steps):
+            f.write(block)
+            written += len(block)
+    return written
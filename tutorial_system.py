@@ -52,6 +52,30 @@ class TutorialSystem:
                 ]
             }
         }
+        self.quizzes = {
+            'basics': [
+                {
+                    'question': 'What is the most fuel-efficient transfer orbit?',
+                    'options': ['Direct trajectory', 'Hohmann transfer', 'Spiral orbit'],
+                    'correct': 1,
+                    'explanation': 'Hohmann transfers minimize energy requirements.'
+                },
+                {
+                    'question': 'What does Delta-V measure?',
+                    'options': ['Distance', 'Velocity change', 'Time'],
+                    'correct': 1,
+                    'explanation': 'Delta-V is the total velocity change needed for maneuvers.'
+                }
+            ],
+            'advanced': [
+                {
+                    'question': 'Gravity assists can:',
+                    'options': ['Only slow down spacecraft', 'Speed up or change direction', 'Only work at Jupiter'],
+                    'correct': 1,
+                    'explanation': 'Gravity assists can increase speed and change trajectory.'
+                }
+            ]
+        }
         
     def get_tutorial(self, tutorial_id):
         """Get tutorial by ID"""
@@ -77,28 +101,4 @@ class TutorialSystem:
     
     def generate_quiz(self, tutorial_id):
         """Generate quiz questions for tutorial"""
-        quizzes = {
-            'basics': [
-                {
-                    'question': 'What is the most fuel-efficient transfer orbit?',
-                    'options': ['Direct trajectory', 'Hohmann transfer', 'Spiral orbit'],
-                    'correct': 1,
-                    'explanation': 'Hohmann transfers minimize energy requirements.'
-                },
-                {
-                    'question': 'What does Delta-V measure?',
-                    'options': ['Distance', 'Velocity change', 'Time'],
-                    'correct': 1,
-                    'explanation': 'Delta-V is the total velocity change needed for maneuvers.'
-                }
-            ],
-            'advanced': [
-                {
-                    'question': 'Gravity assists can:',
-                    'options': ['Only slow down spacecraft', 'Speed up or change direction', 'Only work at Jupiter'],
-                    'correct': 1,
-                    'explanation': 'Gravity assists can increase speed and change trajectory.'
-                }
-            ]
-        }
-        return quizzes.get(tutorial_id, [])
\ No newline at end of file
+        return self.quizzes.get(tutorial_id, [])
\ No newline at end of file